@@ -10,7 +10,10 @@ from .configentry import MyConfigEntry, MyData
 from .const import CONF, CONST
 from .jdconst import DEVICELISTS
 from .coordinator import MyCoordinator
+from .entity_helpers import classify_items
+from .hub import JudoHub, get_hub
 from .restobject import RestAPI
+from .storage import LastWrittenValues, ValueSnapshot
 
 logging.basicConfig()
 log = logging.getLogger(__name__)
@@ -31,7 +34,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: MyConfigEntry) -> bool:
     # Store an instance of the "connecting" class that does the work of speaking
     # with your actual devices.
     # hass.data.setdefault(DOMAIN, {})[entry.entry_id] = hub.Hub(hass, entry.data["host"])
-    restapi = RestAPI(config_entry=entry, hass=hass)
+    # the hub owns the connection pool and request budget of all Judo entries
+    hub = get_hub(hass)
+    hub.register(entry.entry_id)
+    try:
+        return await _async_setup_entry(hass, entry, hub)
+    except Exception:
+        # HA does not unload a failed setup, e.g. after ConfigEntryNotReady,
+        # so the entry must not keep its slot at the hub for the retry
+        await _async_release_hub(hass, entry.entry_id)
+        raise
+
+
+async def _async_setup_entry(
+    hass: HomeAssistant, entry: MyConfigEntry, hub: JudoHub
+) -> bool:
+    """Set up the entry after it was registered at the hub."""
+    restapi = RestAPI(config_entry=entry, hass=hass, hub=hub)
     # await restapi.login()
 
     itemlist = []
@@ -39,16 +58,42 @@ async def async_setup_entry(hass: HomeAssistant, entry: MyConfigEntry) -> bool:
     for device in DEVICELISTS:
         for item in device:
             itemlist.append(item)
+    # one pass over all items, the platforms take their bucket
+    items_by_platform = classify_items(itemlist)
 
+    # read the stored select values once for all entities of the entry
+    last_written = LastWrittenValues(hass, entry.entry_id)
+    await last_written.async_load()
+
+    snapshot = ValueSnapshot(hass, entry.entry_id)
     coordinator = MyCoordinator(
-        hass=hass, my_api=restapi, api_items=itemlist, p_config_entry=entry
+        hass=hass,
+        my_api=restapi,
+        api_items=itemlist,
+        p_config_entry=entry,
+        snapshot=snapshot,
     )
-    await coordinator.async_config_entry_first_refresh()
+    # the last known good values are shown until the first scan has finished
+    restored = coordinator.restore(await snapshot.async_load())
+    if entry.data.get(CONF.FAST_START, CONST.FAST_START):
+        if not restored:
+            # nothing to show yet, the entities are unavailable until the first scan
+            coordinator.last_update_success = False
+        # the device is probed and scanned in the background, so the setup
+        # does not depend on a slow or unreachable device
+        entry.async_create_background_task(
+            hass, coordinator.async_start(), "judo_rest_api first scan"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     entry.runtime_data = MyData(
         rest_api=restapi,
         hass=hass,
         coordinator=coordinator,
+        last_written=last_written,
+        snapshot=snapshot,
+        items_by_platform=items_by_platform,
     )
 
     # see https://community.home-assistant.io/t/config-flow-how-to-update-an-existing-entity/522442/8
@@ -101,6 +146,25 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # This is called when an entry/configured device is to be removed. The class
     # needs to unload itself, and remove callbacks. See the classes for further
     # details
-    entry.runtime_data.rest_api.close()
+    await entry.runtime_data.rest_api.close()
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    await entry.runtime_data.last_written.async_flush()
+    await entry.runtime_data.snapshot.async_flush()
+    if unload_ok:
+        await _async_release_hub(hass, entry.entry_id)
     return unload_ok
+
+
+async def _async_release_hub(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove an entry from the hub, close the hub with the last entry."""
+    hub = get_hub(hass)
+    hub.unregister(entry_id)
+    if hub.empty:
+        await hub.close()
+        hass.data.pop(CONST.DOMAIN, None)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored values of a deleted entry."""
+    await LastWrittenValues(hass, entry.entry_id).async_remove()
+    await ValueSnapshot(hass, entry.entry_id).async_remove()
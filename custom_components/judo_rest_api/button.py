@@ -8,9 +8,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .configentry import MyConfigEntry
-from .const import TYPES
 from .entity_helpers import build_entity_list
-from .jdconst import DEVICELISTS
 
 logging.basicConfig()
 log: logging.Logger = logging.getLogger(name=__name__)
@@ -23,22 +21,10 @@ async def async_setup_entry(
 ) -> None:
     """Set up the button platform."""
     _useless = hass
-    # start with an empty list of entries
-    entries = []
-
-    # we create one communicator per integration only for better performance and to allow dynamic parameters
-    coordinator = config_entry.runtime_data.coordinator
-
-    for device in DEVICELISTS:
-        entries = await build_entity_list(
-            entries=entries,
-            config_entry=config_entry,
-            rest_items=device,
-            item_type=TYPES.BUTTON,
-            coordinator=coordinator,
-        )
+    # the items were bucketed by platform once in async_setup_entry
+    entries = build_entity_list(config_entry=config_entry, platform="button")
 
     async_add_entities(
         entries,
-        update_before_add=True,
+        update_before_add=False,
     )
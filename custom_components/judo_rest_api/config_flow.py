@@ -66,6 +66,11 @@ class ConfigFlow(config_entries.ConfigFlow, domain=CONST.DOMAIN):  # pylint: dis
                 vol.Optional(schema=CONF.PASSWORD, default="Connectivity"): str,
                 vol.Optional(schema=CONF.DEVICE_POSTFIX, default=""): str,
                 vol.Optional(schema=CONF.SCAN_INTERVAL, default="60"): str,
+                vol.Optional(
+                    schema=CONF.MAX_CONCURRENT_REQUESTS,
+                    default=CONST.MAX_CONCURRENT_REQUESTS,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                vol.Optional(schema=CONF.FAST_START, default=CONST.FAST_START): bool,
             }
         )
 
@@ -93,6 +98,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=CONST.DOMAIN):  # pylint: dis
                 CONF.PASSWORD: "password",
                 CONF.DEVICE_POSTFIX: "Device-Postfix",
                 CONF.SCAN_INTERVAL: "scan_interval",
+                CONF.MAX_CONCURRENT_REQUESTS: "max_concurrent_requests",
+                CONF.FAST_START: "fast_start",
             },
         )
 
@@ -133,6 +140,18 @@ class ConfigFlow(config_entries.ConfigFlow, domain=CONST.DOMAIN):  # pylint: dis
                     schema=CONF.SCAN_INTERVAL,
                     default=reconfigure_entry.data[CONF.SCAN_INTERVAL],
                 ): str,
+                vol.Optional(
+                    schema=CONF.MAX_CONCURRENT_REQUESTS,
+                    default=reconfigure_entry.data.get(
+                        CONF.MAX_CONCURRENT_REQUESTS, CONST.MAX_CONCURRENT_REQUESTS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                vol.Optional(
+                    schema=CONF.FAST_START,
+                    default=reconfigure_entry.data.get(
+                        CONF.FAST_START, CONST.FAST_START
+                    ),
+                ): bool,
             }
         )
 
@@ -147,6 +166,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=CONST.DOMAIN):  # pylint: dis
                 CONF.PASSWORD: "password",
                 CONF.DEVICE_POSTFIX: "Device-Postfix",
                 CONF.SCAN_INTERVAL: "scan_interval",
+                CONF.MAX_CONCURRENT_REQUESTS: "max_concurrent_requests",
+                CONF.FAST_START: "fast_start",
             },
         )
 
@@ -12,5 +12,8 @@ class MyData:
     rest_api: any
     hass: HomeAssistant
     coordinator: any  # MyCoordinator
+    last_written: any  # LastWrittenValues
+    snapshot: any  # ValueSnapshot
+    items_by_platform: dict  # platform -> list of RestItem
 
 type MyConfigEntry = ConfigEntry[MyData]
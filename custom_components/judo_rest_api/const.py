@@ -21,6 +21,8 @@ class ConfConstants:
     USERNAME = CONF_USERNAME
     DEVICE_POSTFIX = "Device-Postfix"
     SCAN_INTERVAL = CONF_SCAN_INTERVAL
+    MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+    FAST_START = "fast_start"
 
 
 CONF = ConfConstants()
@@ -32,6 +34,20 @@ class MainConstants:
 
     DOMAIN = "judo_rest_api"
     SCAN_INTERVAL = "60"  # timedelta(seconds=60))
+    FAST_SCAN_INTERVAL = 10  # seconds, used while water is flowing
+    SCAN_TIMEOUT = 300  # seconds, upper bound of the budget of one scan
+    SCAN_BUDGET = 0.8  # share of the poll interval the batch read of one scan may take
+    CONNECT_TIMEOUT = 3  # seconds to open a connection to the device
+    READ_TIMEOUT = 10  # seconds to wait for the response of a read
+    WRITE_TIMEOUT = 2  # seconds to wait for the response of a write
+    WRITE_DEBOUNCE = 0.5  # seconds, writes to one command within it are coalesced
+    BREAKER_THRESHOLD = 3  # consecutive failed requests until the device is offline
+    BREAKER_BACKOFF_MIN = 30  # seconds until the first probe of an offline device
+    BREAKER_BACKOFF_MAX = 900  # seconds, upper limit of the exponential backoff
+    MAX_CONCURRENT_REQUESTS = 1  # 1 = sequential scan
+    HUB_MAX_CONCURRENT_REQUESTS = 4  # requests of all entries at the same time
+    POLL_ONCE = 0  # poll_interval of items that are read only once at startup
+    FAST_START = True  # setup does not wait for the device
     UNIQUE_ID = "unique_id"
     APPID = 100
 
@@ -77,6 +93,30 @@ class TypeConstants:
 TYPES = TypeConstants()
 
 
+@dataclass(frozen=True)
+class SmoothingConstants:
+    """Smoothing methods of calculated rates."""
+
+    WINDOW = "window"  # average over the window
+    EWMA = "ewma"  # exponentially weighted moving average
+    REGRESSION = "regression"  # linear regression over the window
+
+
+SMOOTHING = SmoothingConstants()
+
+
+@dataclass(frozen=True)
+class PriorityConstants:
+    """Priorities of the command queue, lower values are sent first."""
+
+    WRITE = 0  # writes triggered by the user
+    READ = 1  # single reads, e.g. the device probe
+    SCAN = 2  # background reads of the coordinator scan
+
+
+PRIORITY = PriorityConstants()
+
+
 @dataclass(frozen=True)
 class DeviceConstants:
     """Device constants."""
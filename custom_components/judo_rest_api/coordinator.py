@@ -2,20 +2,39 @@
 
 import asyncio
 import logging
-from datetime import timedelta
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .configentry import MyConfigEntry
-from .const import CONF, FORMATS
+from .const import CONF, CONST, SMOOTHING
+from .flowrate import RateEstimator
 from .items import RestItem
-from .restobject import RestAPI, RestObject
+from .jdconst import ITEM_DEPENDENCIES
+from .restobject import RestAPI
+from .storage import ValueSnapshot
 
 logging.basicConfig()
 log = logging.getLogger(__name__)
 
 
+@dataclass
+class MyCoordinatorData:
+    """Snapshot of the item values after a scan cycle."""
+
+    # translation_key -> state of all items
+    values: dict[str, Any] = field(default_factory=dict)
+    # translation keys of the items whose state changed in this cycle
+    changed: set[str] = field(default_factory=set)
+
+
 class MyCoordinator(DataUpdateCoordinator):
     """My custom coordinator."""
 
@@ -25,8 +44,12 @@ class MyCoordinator(DataUpdateCoordinator):
         my_api: RestAPI,
         api_items: RestItem,
         p_config_entry: MyConfigEntry,
+        snapshot: ValueSnapshot | None = None,
     ) -> None:
-        """Initialize my coordinator."""
+        """Initialize my coordinator.
+
+        :param snapshot: persisted last known good values, updated after each scan
+        """
         super().__init__(
             hass,
             log,
@@ -37,53 +60,288 @@ class MyCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(
                 seconds=int(p_config_entry.data[CONF.SCAN_INTERVAL])
             ),
-            # Set always_update to `False` if the data returned from the
-            # api can be compared via `__eq__` to avoid duplicate updates
-            # being dispatched to listeners
-            always_update=True,
+            # MyCoordinatorData can be compared via `__eq__`, so listeners
+            # are not called when a cycle did not change anything
+            always_update=False,
         )
         self._rest_api = my_api
         self._device = None
         self._restitems = api_items
         self._number_of_items = len(api_items)
+        # per-entry runtime state, indexed like self._restitems. The items
+        # themselves are shared definitions and are never mutated.
+        self._states: list = [None] * self._number_of_items
         self._config_entry = p_config_entry
-        self._previous_water_total = None
+        self._previous_water_total_time = 0.0
         self._default_scan_interval = timedelta(seconds=int(p_config_entry.data[CONF.SCAN_INTERVAL]))
+        self._failed_items: set[str] = set()
+        self._changed: set[str] = set()
+        # registers of the running scan that were not read yet
+        self._pending: dict[str, list[int]] = {}
+        # the first live scan runs at once, the following polls run in the
+        # phase of this entry, see _schedule_phase
+        self._phase_scheduled = False
 
-    async def get_value(self, rest_item: RestItem):
-        """Read a value from the rest API"""
+        # water_total is due in every cycle while the fast interval is active
+        self._fast_polling = False
+        # lookup indices, built once so entities do not scan the item list
+        self._index_by_key: dict[str, int] = {}
+        self._items_by_key: dict[str, RestItem] = {}
+        # all readable items by register, a register is always decoded completely
+        self._registers: dict[str, list[int]] = {}
+        for index, item in enumerate(self._restitems):
+            self._index_by_key[item.translation_key] = index
+            self._items_by_key[item.translation_key] = item
+            if item.readable:
+                self._registers.setdefault(item.address_read, []).append(index)
 
-        if rest_item.format is FORMATS.BUTTON:
-            return None
-        if rest_item.format is FORMATS.NUMBER_WO:
-            return None
-        if rest_item.format is FORMATS.NUMBER_INTERNAL: 
-            return None
-        if rest_item.format is FORMATS.SWITCH_INTERNAL: 
-            return None
-        if rest_item.format is FORMATS.STATUS_WO:
-            return None
-        ro = RestObject(self._rest_api, rest_item)
-        if ro is None:
-            log.warning("RestObject is None for Item %s", rest_item.translation_key)
-            # rest_item.state = None
-        else:
-            val = await ro.value
-            if val is not None:
-                log.debug(
-                    "Set Value %s for Item %s", str(val), rest_item.translation_key
+        self._total_idx = self._index_by_key.get("water_total")
+        # multi-rate scheduler: monotonic time at which an item is due again
+        self._next_poll: list[float] = [0.0] * self._number_of_items
+        # monotonic time at which an item was last read from the device
+        self._sample_times: list[float] = [0.0] * self._number_of_items
+        # unix time of the state of an item, kept in the snapshot
+        self._timestamps: list[float] = [0.0] * self._number_of_items
+        # index -> number of writes of entities not yet answered by the device
+        self._writing: dict[int, int] = {}
+        self._snapshot = snapshot
+
+        # rate estimator of water_flow, configured by the params of the item
+        flow_params = {}
+        flow_item = self._items_by_key.get("water_flow")
+        if flow_item is not None and flow_item.params is not None:
+            flow_params = flow_item.params
+        self._flow_estimator = RateEstimator(
+            method=flow_params.get("smoothing", SMOOTHING.WINDOW),
+            window=flow_params.get("window", 3),
+            alpha=flow_params.get("alpha", 0.5),
+            resolution=flow_params.get("resolution", 1),
+        )
+
+        # items that have to be fetched along with a listening item
+        keys = self._index_by_key
+        self._dependencies: dict[int, tuple[int, ...]] = {}
+        for key, depends_on in ITEM_DEPENDENCIES.items():
+            if key in keys:
+                self._dependencies[keys[key]] = tuple(
+                    keys[dep] for dep in depends_on if dep in keys
                 )
-                rest_item.state = val
+
+    def _set_item_value(self, index: int, payload: bytes) -> None:
+        """Decode the value of an item from a register payload and store it."""
+        rest_item = self._restitems[index]
+        val = rest_item.decoder(payload)
+        if val is not None:
+            log.debug("Set Value %s for Item %s", str(val), rest_item.translation_key)
+            self._store(index, val)
+        else:
+            log.warning("None value for Item %s ignored", rest_item.translation_key)
+
+    def group_by_register(self, indices) -> dict[str, list[int]]:
+        """Group the registers that have to be read for the given items.
+
+        Every item bound to one of these registers is returned, not only the
+        requested ones, since decoding them from the shared payload is free.
+
+        :param indices: indices of the items to be updated
+        :returns: dict of address_read -> list of item indices
+        """
+        registers: dict[str, list[int]] = {}
+        for index in indices:
+            item = self._restitems[index]
+            if item.readable and item.address_read not in registers:
+                registers[item.address_read] = self._registers[item.address_read]
+        return registers
+
+    def item_index(self, rest_item: RestItem) -> int:
+        """Return the index of an item, used as coordinator context."""
+        return self._index_by_key[rest_item.translation_key]
+
+    def get_item(self, translation_key: str) -> RestItem | None:
+        """Return the item with the given translation key."""
+        return self._items_by_key.get(translation_key)
+
+    def expand_dependencies(self, indices) -> set[int]:
+        """Add the items the given items are derived from."""
+        to_update = set(indices)
+        for index in indices:
+            to_update.update(self._dependencies.get(index, ()))
+        return to_update
+
+    def due_items(self, indices) -> list[int]:
+        """Return the items whose poll interval has elapsed."""
+        # tolerate a small jitter of the coordinator timer
+        now = time.monotonic() + 1
+        return [index for index in indices if self._next_poll[index] <= now]
+
+    def _store(self, index: int, val) -> None:
+        """Store the state of an item and note it as changed in this cycle."""
+        if val != self._states[index]:
+            self._changed.add(self._restitems[index].translation_key)
+        self._states[index] = val
+        self._timestamps[index] = time.time()
+
+    def _schedule(self, indices: list[int]) -> None:
+        """Set the time of the next read for freshly read items."""
+        now = time.monotonic()
+        for index in indices:
+            interval = self._restitems[index].poll_interval
+            if index == self._total_idx and self._fast_polling:
+                # water_total is sampled in every fast cycle
+                self._next_poll[index] = now + CONST.FAST_SCAN_INTERVAL
+            elif interval is None:
+                # polled with the configured scan interval, also while the
+                # coordinator runs at the fast interval for water_total
+                self._next_poll[index] = now + self._default_scan_interval.total_seconds()
+            elif interval == CONST.POLL_ONCE:
+                self._next_poll[index] = math.inf
             else:
-                log.warning("None value for Item %s ignored", rest_item.translation_key)
-        return rest_item.state
+                self._next_poll[index] = now + interval
+
+    def decode_register(self, indices: list[int], res: str) -> None:
+        """Decode all items bound to one register from its raw response.
+
+        :param indices: indices of the items that are read from this register
+        :param res: raw hex response of the register
+        """
+        sample_time = time.monotonic()
+        # the hex string is parsed once per register, not once per item
+        payload = bytes.fromhex(res)
+        for index in indices:
+            if index in self._writing:
+                # read before the write of an entity was answered
+                continue
+            self._set_item_value(index, payload)
+            self._sample_times[index] = sample_time
+        self._schedule(indices)
+
+    @contextmanager
+    def pending_write(self, index: int):
+        """Keep scans from overwriting the state of an item while it is written.
+
+        :param index: index of the item written by an entity
+        """
+        self._writing[index] = self._writing.get(index, 0) + 1
+        try:
+            yield
+        finally:
+            self._writing[index] -= 1
+            if not self._writing[index]:
+                del self._writing[index]
+
+    def get_state(self, index: int):
+        """Return the state of the item with the given index."""
+        return self._states[index]
+
+    def set_state(self, index: int, value) -> None:
+        """Set the state of an item, e.g. after it was written by an entity.
+
+        The snapshot is not saved here, write-only items are kept by
+        LastWrittenValues and read items are saved after the next scan.
+        """
+        self._states[index] = value
+        self._timestamps[index] = time.time()
+
+    def restore(self, values: dict[str, tuple]) -> bool:
+        """Fill the states from the persisted snapshot and publish them.
+
+        :param values: translation_key -> (value, unix timestamp of the read)
+        :returns: True if at least one value was restored
+        """
+        restored = 0
+        for key, (value, timestamp) in values.items():
+            index = self._index_by_key.get(key)
+            if index is None or value is None:
+                continue
+            if not self._restitems[index].readable:
+                continue
+            self._states[index] = value
+            self._timestamps[index] = timestamp
+            restored += 1
+        if not restored:
+            return False
+        log.debug("Restored %d values from the snapshot", restored)
+        # the items are still due, the first scan reads all of them
+        self.async_set_updated_data(
+            MyCoordinatorData(values=self._values(), changed=set(values))
+        )
+        return True
+
+    def _snapshot_values(self) -> dict[str, list]:
+        """Return the values to be persisted, with the unix time of their read.
+
+        Only items read from the device, items that are never read would
+        keep the time of their write and expire from the snapshot.
+        """
+        return {
+            item.translation_key: [self._states[index], self._timestamps[index]]
+            for index, item in enumerate(self._restitems)
+            if item.readable
+            and self._timestamps[index]
+            and self._states[index] is not None
+        }
+
+    def _save_snapshot(self) -> None:
+        """Schedule a save of the snapshot."""
+        if self._snapshot is not None:
+            self._snapshot.save(self._snapshot_values)
+
+    def _values(self) -> dict[str, Any]:
+        """Return the states of all items by translation key."""
+        return {
+            item.translation_key: self._states[index]
+            for index, item in enumerate(self._restitems)
+        }
 
     def get_value_from_item(self, translation_key: str) -> int:
         """Read a value from another rest item"""
-        for _useless, item in enumerate(self._restitems):
-            if item.translation_key == translation_key:
-                return item.state
-        return None
+        index = self._index_by_key.get(translation_key)
+        if index is None:
+            return None
+        return self._states[index]
+
+    def _update_water_flow(self) -> None:
+        """Derive water_flow from water_total and adapt the poll interval.
+
+        While water_flow_check_on_off is on and water_total changes, the
+        coordinator polls with CONST.FAST_SCAN_INTERVAL, otherwise with the
+        configured scan interval. Only water_total is due in the fast cycles.
+        """
+        total_idx = self._total_idx
+        if total_idx is None:
+            return
+        sample_time = self._sample_times[total_idx]
+        if sample_time == self._previous_water_total_time:
+            # water_total was not read in this cycle
+            return
+        self._previous_water_total_time = sample_time
+        water_total = self._states[total_idx]
+        flow_check = self.get_value_from_item("water_flow_check_on_off")
+
+        flow_rate = 0
+        if flow_check and water_total is not None:
+            # liters per second from the timestamped samples -> l/min
+            liters = round(water_total * 1000, 3)
+            flow_rate = self._flow_estimator.add_sample(sample_time, liters) * 60
+        else:
+            self._flow_estimator.reset()
+
+        flow_idx = self._index_by_key.get("water_flow")
+        if flow_idx is not None:
+            self._store(flow_idx, flow_rate)
+
+        self._fast_polling = flow_rate > 0
+        if self._fast_polling:
+            interval = timedelta(seconds=CONST.FAST_SCAN_INTERVAL)
+            # water_total was scheduled with the default interval when it was read
+            self._next_poll[total_idx] = min(
+                self._next_poll[total_idx], sample_time + CONST.FAST_SCAN_INTERVAL
+            )
+        else:
+            interval = self._default_scan_interval
+        if interval != self.update_interval:
+            log.debug("Poll interval %s", interval)
+            self.update_interval = interval
 
     async def _async_setup(self):
         """Set up the coordinator.
@@ -97,8 +355,34 @@ class MyCoordinator(DataUpdateCoordinator):
         # await self._rest_api.login()
         await self._rest_api.connect()
 
-    async def fetch_data(self, idx=None):
-        """Fetch all values from the REST."""
+    def _schedule_phase(self) -> None:
+        """Move the polls of this entry into its own phase of the hub.
+
+        A refresh restarts the timer of the coordinator, so one refresh at
+        the start of the phase keeps all following polls in it.
+        """
+        delay = self._rest_api.hub.poll_phase(
+            self._config_entry.entry_id, self._default_scan_interval.total_seconds()
+        )
+        log.debug("Next poll in %.1f s", delay)
+        self._config_entry.async_on_unload(
+            async_call_later(self.hass, delay, self._async_phase_refresh)
+        )
+
+    async def _async_phase_refresh(self, _now: datetime) -> None:
+        """Refresh at the start of the phase of this entry."""
+        await self.async_refresh()
+
+    async def async_start(self) -> None:
+        """Probe the device and run the first scan without blocking the setup."""
+        await self._async_setup()
+        await self.async_refresh()
+
+    async def fetch_data(self, idx=None) -> MyCoordinatorData:
+        """Fetch all values from the REST.
+
+        :returns: snapshot of all item values and the keys changed in this cycle
+        """
         # if idx is not None:
         if idx is None:
             # first run: Update all entitiies
@@ -108,29 +392,66 @@ class MyCoordinator(DataUpdateCoordinator):
             to_update = tuple(range(len(self._restitems)))
         else:
             # idx exists and is filled up: Update only entitys requested by the coordinator.
-            to_update = idx
+            to_update = self.expand_dependencies(idx)
 
         # log.info("Start Scan")
-        for index in to_update:
-            item = self._restitems[index]
-            try:
-                await self.get_value(item)
-#                if item.translation_key == "water_total":
-#                    current_water_total = item.state
-#                    flow_check = self.get_value_from_item("water_flow_check_on_off")
-#                    log.debug("Wasser_total: %s", current_water_total)
-#                    if flow_check == 1 and self._previous_water_total is not None and current_water_total != self._previous_water_total:
-#                        self.update_interval = timedelta(seconds=10)
-#                        log.debug("Interval 10s")
-#                    else:
-#                        self.update_interval = self._default_scan_interval
-#                        log.debug("Interval 60s")
-#                    self._previous_water_total = current_water_total
-            except Exception:
+        # items sharing the same address_read are fetched with one request,
+        # a register is read as soon as one of its items is due
+        registers = self.group_by_register(self.due_items(to_update))
+        # registers left over by a timed out scan are still due and have
+        # waited longest, so the scan resumes with them instead of index 0
+        self._pending = dict(
+            sorted(
+                registers.items(),
+                key=lambda reg: min(self._next_poll[i] for i in reg[1]),
+            )
+        )
+        self._changed = set()
+        # one batch per scan, so the scan is timed and bounded as a unit.
+        # The command queue limits how many registers are read at once.
+        # Every register is decoded as soon as it arrives.
+        await self._rest_api.get_rest_batch(
+            list(self._pending),
+            timeout=self.scan_budget,
+            on_result=self._on_register,
+        )
+        if self._rest_api.available:
+            for address in self._pending:
                 log.warning(
-                    "connection to Judo Zewa failed for %s",
-                    item.translation_key,
+                    "connection to Judo Zewa failed for register %s",
+                    address,
                 )
+        return self._finish_scan()
+
+    def _on_register(self, address: str, res: str) -> None:
+        """Decode a register as soon as its response arrived."""
+        indices = self._pending.get(address)
+        if indices is None:
+            return
+        try:
+            self.decode_register(indices, res)
+        except (ValueError, IndexError):
+            log.warning("Invalid response %s for register %s", res, address)
+            return
+        del self._pending[address]
+
+    def _finish_scan(self) -> MyCoordinatorData:
+        """Close a complete or interrupted scan and return its snapshot.
+
+        Registers that were not read stay due, the next scan reads them first.
+        """
+        self._failed_items = {
+            self._restitems[i].translation_key
+            for indices in self._pending.values()
+            for i in indices
+        }
+        self._pending = {}
+        self._update_water_flow()
+        log.debug("Command queue %s", self._rest_api.queue_stats)
+        if self._changed:
+            self._save_snapshot()
+
+        return MyCoordinatorData(values=self._values(), changed=self._changed)
 
     async def _async_update_data(self):
         """Fetch data from API endpoint.
@@ -138,17 +459,54 @@ class MyCoordinator(DataUpdateCoordinator):
         This is the place to pre-process the data to lookup tables
         so entities can quickly look up their data.
         """
+        if not self._phase_scheduled:
+            self._phase_scheduled = True
+            self._schedule_phase()
         try:
             # Note: asyncio.TimeoutError and aiohttp.ClientError are already
             # handled by the data update coordinator.
-            async with asyncio.timeout(60):
+            # the scan keeps its own budget, scan_budget, and returns the
+            # registers read so far. This is only a safety net.
+            async with asyncio.timeout(self.scan_budget + 10):
                 # Grab active context variables to limit data required to be fetched from API
                 # Note: using context is not required if there is no need or ability to limit
                 # data retrieved from API.
-                # listening_idx = set(self.async_contexts())
-                return await self.fetch_data()  # !!!!!using listening_idx will result in some entities nevwer updated !!!!!
+                # Entities use their index in the item list as context, derived items
+                # pull in their sources via ITEM_DEPENDENCIES. Disabled entities do
+                # not listen, so their registers are not read.
+                listening_idx = {
+                    idx for idx in self.async_contexts() if idx is not None
+                }
+                data = await self.fetch_data(listening_idx)
+        except TimeoutError:
+            # keep what was read so far, the rest is resumed in the next cycle
+            log.warning(
+                "Scan of Judo Zewa timed out, %d registers deferred",
+                len(self._pending),
+            )
+            data = self._finish_scan()
         except Exception:
             log.warning("Error fetching Judo Zewa data")
+            return None
+        if not self._rest_api.available:
+            # circuit breaker is open: mark the entities unavailable
+            raise UpdateFailed("Judo Zewa not reachable")
+        return data
+
+    @property
+    def scan_budget(self) -> float:
+        """Return the time in seconds one scan may take.
+
+        A share of the current poll interval, so a scan during fast polling
+        ends before the next one is due.
+        """
+        interval = self.update_interval.total_seconds()
+        return min(CONST.SCAN_TIMEOUT, CONST.SCAN_BUDGET * interval)
+
+    @property
+    def failed_items(self) -> set[str]:
+        """Return the translation keys of the items that failed in the last scan."""
+        return self._failed_items
 
     @property
     def rest_api(self):
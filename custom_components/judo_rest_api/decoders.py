@@ -0,0 +1,94 @@
+"""Decoders for register payloads.
+
+A decoder is compiled once per RestItem when the item table is loaded.
+It is bound to the offset, length, byte order and divider of the item and
+converts the raw bytes of a register into the value of the item.
+"""
+
+import logging
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from .const import FORMATS
+
+logging.basicConfig()
+log = logging.getLogger(__name__)
+
+type Decoder = Callable[[bytes], Any]
+
+
+def build_decoder(
+    mformat: str,
+    read_index: int,
+    read_bytes: int,
+    divider=1,
+    number_to_key: Callable[[int], str] | None = None,
+    name: str = "",
+) -> Decoder:
+    """Build the decoder of one item.
+
+    :param mformat: format of the item
+    :param read_index: byte offset of the item in the register
+    :param read_bytes: number of bytes of the item
+    :param divider: divider of number items
+    :param number_to_key: conversion of status numbers into translation keys
+    :param name: name of the item, used for logging
+    :returns: function that decodes the item from a register payload
+    """
+    start = read_index
+    end = read_index + read_bytes
+
+    match mformat:
+        case FORMATS.NUMBER:
+
+            def decode(payload: bytes):
+                raw = payload[start:end]
+                if not raw:
+                    return None
+                return int.from_bytes(raw, "little") / divider
+
+        case FORMATS.SW_VERSION:
+
+            def decode(payload: bytes):
+                raw = payload[start:end][::-1]
+                if not raw:
+                    return None
+                return str(raw[0]) + "." + str(raw[1]).zfill(2) + raw[2:3].decode()
+
+        case FORMATS.TIMESTAMP:
+
+            def decode(payload: bytes):
+                raw = payload[start:end]
+                if not raw:
+                    return None
+                return str(datetime.fromtimestamp(int.from_bytes(raw, "big")))
+
+        case FORMATS.TEXT:
+
+            def decode(payload: bytes):
+                raw = payload[start:end]
+                if not raw:
+                    return None
+                return raw.decode()
+
+        case FORMATS.STATUS:
+
+            def decode(payload: bytes):
+                raw = payload[start:end]
+                if not raw or number_to_key is None:
+                    return None
+                return number_to_key(int.from_bytes(raw, "little"))
+
+        case FORMATS.SWITCH:
+
+            def decode(payload: bytes):
+                return None
+
+        case _:
+
+            def decode(payload: bytes):
+                log.warning("Unknown format: %s in %s", str(mformat), name)
+                return None
+
+    return decode
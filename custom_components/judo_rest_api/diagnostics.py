@@ -0,0 +1,26 @@
+"""Diagnostics support for the Judo REST API integration."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .configentry import MyConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: MyConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of a config entry.
+
+    Credentials are not included, only the stats of the connection.
+    """
+    _useless = hass
+    rest_api = entry.runtime_data.rest_api
+    return {
+        # aggregate throughput and latency of all Judo entries
+        "hub": rest_api.hub.stats,
+        # depth and wait times of the command queue of this device
+        "command_queue": rest_api.queue_stats,
+        # items whose register could not be read in the last scan
+        "failed_items": sorted(entry.runtime_data.coordinator.failed_items),
+    }
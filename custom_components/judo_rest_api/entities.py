@@ -1,9 +1,6 @@
 """Entity classes used in this integration"""
 
 import logging
-import time
-import asyncio
-import collections
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.components.number import NumberEntity
@@ -21,7 +18,7 @@ from .coordinator import MyCoordinator
 from .items import RestItem
 from .restobject import RestAPI, RestObject
 
-from .storage import save_last_written_value, load_last_written_values, PERSISTENT_ENTITIES
+from .storage import PERSISTENT_ENTITIES
 
 logging.basicConfig()
 log = logging.getLogger(__name__)
@@ -43,6 +40,7 @@ class MyEntity(Entity):
     _attr_has_entity_name = True
     _attr_entity_name = None
     _divider = 1
+    _last_written = None
 
     def __init__(
         self,
@@ -115,6 +113,23 @@ class MyEntity(Entity):
             if icon is not None:
                 self._attr_icon = icon
 
+    async def async_added_to_hass(self) -> None:
+        """Show the state the coordinator already holds, e.g. from the snapshot."""
+        await super().async_added_to_hass()
+        # all subclasses are coordinator entities
+        self._handle_coordinator_update()
+
+    def async_write_if_changed(self, value) -> None:
+        """Write the state to HA only if the value or the availability changed.
+
+        Avoids no-op writes to the state machine and the recorder on every scan.
+        """
+        written = (value, self.available)
+        if written == self._last_written:
+            return
+        self._last_written = written
+        self.async_write_ha_state()
+
     def my_device_info(self) -> DeviceInfo:
         """Build the device info."""
         return {
@@ -154,8 +169,8 @@ class MySensorEntity(CoordinatorEntity, SensorEntity, MyEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._attr_native_value = self._rest_item.state
-        self.async_write_ha_state()
+        self._attr_native_value = self.coordinator.get_state(self.idx)
+        self.async_write_if_changed(self._attr_native_value)
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -188,17 +203,18 @@ class MyNumberEntity(CoordinatorEntity, NumberEntity, MyEntity):  # pylint: disa
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._attr_native_value = self._rest_item.state
-        self.async_write_ha_state()
+        self._attr_native_value = self.coordinator.get_state(self._idx)
+        self.async_write_if_changed(self._attr_native_value)
 
     async def async_set_native_value(self, value: float) -> None:
         """Send value over modbus and refresh HA."""
         # Ensure we are dealing with the correct translation keys
         ro = RestObject(self._rest_api, self._rest_item)
-        await ro.setvalue(value)  # rest_item.state will be set inside ro.setvalue
-        #self._rest_item.state = value #SPÄTER AUSKOMMENTIEREN
-        self._attr_native_value = self._rest_item.state
-        self.async_write_ha_state()
+        with self.coordinator.pending_write(self._idx):
+            await ro.setvalue(value)
+        self.coordinator.set_state(self._idx, value)
+        self._attr_native_value = value
+        self.async_write_if_changed(self._attr_native_value)
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -229,26 +245,26 @@ class MySwitchEntity(CoordinatorEntity, SwitchEntity, MyEntity):  # pylint: disa
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         #self._attr_is_on = self._rest_item.state   ####Wird nicht mehr durch API geupdatet!
-        self._attr_is_on = self._rest_item.state == 1   ##Ersetzt Zeile darüber weil nicht mehr über Api sondern nur intern
-        self.async_write_ha_state()
+        self._attr_is_on = self.coordinator.get_state(self._idx) == 1   ##Ersetzt Zeile darüber weil nicht mehr über Api sondern nur intern
+        self.async_write_if_changed(self._attr_is_on)
 
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
         ro = RestObject(self._rest_api, self._rest_item)
-        await ro.setvalue(1)  # rest_item.state will be set inside ro.setvalue
-        self._rest_item.state = True  ####schreibt den state direkt in den coordinator ohne über die API zu lesen
+        await ro.setvalue(1)
+        self.coordinator.set_state(self._idx, True)  ####schreibt den state direkt in den coordinator ohne über die API zu lesen
         self._attr_is_on = True ##Ersetzt Zeile darunter weil nicht mehr über Api sondern nur intern
         #self._attr_is_on = self._rest_item.state ####Wird nicht mehr durch API geupdatet!
-        self.async_write_ha_state()
+        self.async_write_if_changed(self._attr_is_on)
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
         ro = RestObject(self._rest_api, self._rest_item)
-        await ro.setvalue(0)  # rest_item.state will be set inside ro.setvalue
-        self._rest_item.state = False ####schreibt den state direkt in den coordinator ohne über die API zu lesen
+        await ro.setvalue(0)
+        self.coordinator.set_state(self._idx, False) ####schreibt den state direkt in den coordinator ohne über die API zu lesen
         self._attr_is_on = False ##Ersetzt Zeile darunter weil nicht mehr über Api sondern nur intern
         #self._attr_is_on = self._rest_item.state   ####Wird nicht mehr durch API geupdatet!
-        self.async_write_ha_state()
+        self.async_write_if_changed(self._attr_is_on)
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -277,7 +293,7 @@ class MyButtonEntity(CoordinatorEntity, ButtonEntity, MyEntity):  # pylint: disa
     async def async_press(self):
         """Turn the entity on."""
         ro = RestObject(self._rest_api, self._rest_item)
-        await ro.setvalue()  # rest_item.state will be set inside ro.setvalue
+        await ro.setvalue()
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -312,10 +328,11 @@ class MySelectEntity(CoordinatorEntity, SelectEntity, MyEntity):  # pylint: disa
         await super().async_added_to_hass()
         
         if self._rest_item.translation_key in PERSISTENT_ENTITIES:
-            stored_values = await load_last_written_values(self.hass)
+            # preloaded once in async_setup_entry
+            stored_values = self._config_entry.runtime_data.last_written.values
             if self._rest_item.translation_key in stored_values:
                 self._attr_current_option = stored_values[self._rest_item.translation_key]
-                self._rest_item.state = stored_values[self._rest_item.translation_key]
+                self.coordinator.set_state(self._idx, stored_values[self._rest_item.translation_key])
                 log.debug("Geladene Werte nach If: %s", stored_values)
 
     async def async_select_option(self, option: str) -> None:
@@ -323,24 +340,18 @@ class MySelectEntity(CoordinatorEntity, SelectEntity, MyEntity):  # pylint: disa
 
         #1 special mode absence limit
         if self._rest_item.translation_key in ["absence_limit_max_waterflowrate", "absence_limit_max_water_flow", "absence_limit_max_waterflow_time"]:
-            if not self.coordinator._restitems:
-                raise ValueError("coordinator._restitems ist None oder leer. Keine Entitäten zum Verarbeiten.")
-
             selected_values = {}
 
-            for item in self.coordinator._restitems:
-                if item.translation_key in ["absence_limit_max_waterflowrate", "absence_limit_max_water_flow", "absence_limit_max_waterflow_time"]:
+            for key in ["absence_limit_max_waterflowrate", "absence_limit_max_water_flow", "absence_limit_max_waterflow_time"]:
+                item = self.coordinator.get_item(key)
+                if item is not None:
                     if item.translation_key == self._rest_item.translation_key:
                         # Falls es die aktuelle Entität ist, nehmen wir den neuen Wert (option)
-                        selected_value = next(
-                            (entry.number for entry in item.resultlist if entry.translation_key == option),
-                            None
-                        )
+                        selected_value = item.get_number_from_translation_key(option, None)
                     else:
                         # Für die anderen beiden nehmen wir den alten Wert aus state
-                        selected_value = next(
-                            (entry.number for entry in item.resultlist if entry.translation_key == item.state),
-                            None
+                        selected_value = item.get_number_from_translation_key(
+                            self.coordinator.get_value_from_item(key), None
                         )
 
                     if selected_value is not None:
@@ -360,22 +371,26 @@ class MySelectEntity(CoordinatorEntity, SelectEntity, MyEntity):  # pylint: disa
             
             try:
                 if self._rest_item.translation_key in PERSISTENT_ENTITIES:
-                    await save_last_written_value(self.hass, self._rest_item.translation_key, option)
-                # Senden des kombinierten Zustands
-                await self.coordinator.rest_api.write_value("5F00", bytes.fromhex(payload))
-                self._rest_item.state = option #schreibt den state direkt in den coordinator ohne über die API zu lesen
-                self._attr_current_option = self._rest_item.state
-                self.async_write_ha_state()
+                    self._config_entry.runtime_data.last_written.set(self._rest_item.translation_key, option)
+                # Senden des kombinierten Zustands, nur das Feld dieser Entität
+                # wird in einen noch wartenden Schreibauftrag übernommen
+                field = ordered_keys.index(self._rest_item.translation_key)
+                with self.coordinator.pending_write(self._idx):
+                    res = await self.coordinator.rest_api.write_value(
+                        "5F00", bytes.fromhex(payload), (slice(2 * field, 2 * field + 2),)
+                    )
+                if res is not None:
+                    self.coordinator.set_state(self._idx, option) #schreibt den state direkt in den coordinator ohne über die API zu lesen
+                    self._attr_current_option = option
+                    self.async_write_if_changed(self._attr_current_option)
             except Exception as e:
                 log.error("Fehler beim Senden an Judo: %s", e)
         
         #2 Special mode leakageprotection
         elif self._rest_item.translation_key in ["leakageprotection_max_waterflowrate", "leakageprotection_max_waterflow", "leakageprotection_max_waterflowtime"]:
-            if not self.coordinator._restitems:
-                raise ValueError("coordinator._restitems ist None oder leer. Keine Entitäten zum Verarbeiten.")
-
             # Lade gespeicherte Werte
-            stored_values = await load_last_written_values(self.hass)
+            last_written = self._config_entry.runtime_data.last_written
+            stored_values = last_written.values
             selected_values = {}
 
             # Sammle alle benötigten Werte
@@ -383,26 +398,19 @@ class MySelectEntity(CoordinatorEntity, SelectEntity, MyEntity):  # pylint: disa
                 selected_value = None
                 if key == self._rest_item.translation_key:
                     # Für die aktuelle Entity nehmen wir den neuen Wert
-                    selected_value = next(
-                        (entry.number for entry in self._rest_item.resultlist if entry.translation_key == option),
-                        None
-                    )
+                    selected_value = self._rest_item.get_number_from_translation_key(option, None)
                     if selected_value is not None:
                         # Speichere den neuen Wert
-                        await save_last_written_value(self.hass, key, option)
+                        last_written.set(key, option)
                         log.debug("Gespeicherter Wert oben: %s", selected_value)
                 else:
                     # Für die anderen Entities nehmen wir den gespeicherten Wert
                     stored_option = stored_values.get(key)
                     if stored_option:
                         # Finde den numerischen Wert für die gespeicherte Option
-                        for item in self.coordinator._restitems:
-                            if item.translation_key == key:
-                                selected_value = next(
-                                    (entry.number for entry in item.resultlist if entry.translation_key == stored_option),
-                                    None
-                                )
-                                break
+                        item = self.coordinator.get_item(key)
+                        if item is not None:
+                            selected_value = item.get_number_from_translation_key(stored_option, None)
 
                 if selected_value is not None:
                     selected_values[key] = selected_value
@@ -417,48 +425,55 @@ class MySelectEntity(CoordinatorEntity, SelectEntity, MyEntity):  # pylint: disa
             ordered_keys = ["holiday_mode_write", "leakageprotection_max_waterflowrate", "leakageprotection_max_waterflow", "leakageprotection_max_waterflowtime",]
             #payload = "".join([selected_values[key].to_bytes(2, byteorder="little").hex() for key in ordered_keys])
             payload = ""
+            fields = ()
             for key in ordered_keys:
+                start = len(payload) // 2
                 if key == "holiday_mode_write":
                     payload += selected_values[key].to_bytes(1, byteorder="little").hex()
                 else:
                     payload += selected_values[key].to_bytes(2, byteorder="little").hex()
+                if key == self._rest_item.translation_key:
+                    fields = (slice(start, len(payload) // 2),)
 
             log.debug("Sende Leakageprotection Payload an Judo: %s", payload)
             
             try:
                 if self._rest_item.translation_key in PERSISTENT_ENTITIES:
-                    await save_last_written_value(self.hass, self._rest_item.translation_key, option)
+                    self._config_entry.runtime_data.last_written.set(self._rest_item.translation_key, option)
                     logmeldung = (self.hass, self._rest_item.translation_key, option)
                     log.debug("Gespeicherter Wert unten: %s", logmeldung)
                 # Senden des kombinierten Zustands
-                await self.coordinator.rest_api.write_value("5000", bytes.fromhex(payload))
-                self._rest_item.state = option #schreibt den state direkt in den coordinator ohne über die API zu lesen
-                self._attr_current_option = self._rest_item.state
-                self.async_write_ha_state()
+                with self.coordinator.pending_write(self._idx):
+                    res = await self.coordinator.rest_api.write_value("5000", bytes.fromhex(payload), fields)
+                if res is not None:
+                    self.coordinator.set_state(self._idx, option) #schreibt den state direkt in den coordinator ohne über die API zu lesen
+                    self._attr_current_option = option
+                    self.async_write_if_changed(self._attr_current_option)
             except Exception as e:
                 log.error("Fehler beim Senden an Judo: %s", e)
         else:
             try: #Speichern der Werte die nur geschrieben werden
                 if self._rest_item.translation_key in PERSISTENT_ENTITIES:
-                    await save_last_written_value(self.hass, self._rest_item.translation_key, option)
+                    self._config_entry.runtime_data.last_written.set(self._rest_item.translation_key, option)
                     logmeldung = (self.hass, self._rest_item.translation_key, option)
                     log.debug("Gespeicherter Wert unten ohne Sonder: %s", logmeldung)
 
                 #Daten aktuallisieren und schreiben
                 ro = RestObject(self._rest_api, self._rest_item)
-                await ro.setvalue(option)  # Use the RestObject setvalue method
+                with self.coordinator.pending_write(self._idx):
+                    await ro.setvalue(option)  # Use the RestObject setvalue method
                 # Update the entity's state with the new value
-                self._rest_item.state = option #schreibt den state direkt in den coordinator ohne über die API zu lesen
-                self._attr_current_option = self._rest_item.state
-                self.async_write_ha_state()
+                self.coordinator.set_state(self._idx, option) #schreibt den state direkt in den coordinator ohne über die API zu lesen
+                self._attr_current_option = option
+                self.async_write_if_changed(self._attr_current_option)
             except Exception as e:
                 log.error("Fehler beim Senden an Judo: %s", e)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._attr_current_option = self._rest_item.state
-        self.async_write_ha_state()
+        self._attr_current_option = self.coordinator.get_state(self._idx)
+        self.async_write_if_changed(self._attr_current_option)
     
     @property
     def device_info(self) -> DeviceInfo:
@@ -467,225 +482,25 @@ class MySelectEntity(CoordinatorEntity, SelectEntity, MyEntity):  # pylint: disa
 
 
 class MyCalcSensorEntity(CoordinatorEntity, SensorEntity, MyEntity):
-    """Class that represents a calculated sensor entity."""
+    """Class that represents a calculated sensor entity.
+
+    The value is derived by the coordinator, e.g. water_flow from water_total,
+    which also switches to fast polling while water flows.
+    """
 
     def __init__(self, config_entry: MyConfigEntry, rest_item: RestItem, coordinator: MyCoordinator, idx) -> None:
         """Initialize of MyCalcSensorEntity."""
         super().__init__(coordinator, context=idx)
         self.idx = idx
         MyEntity.__init__(self, config_entry, rest_item, coordinator.rest_api)
-        self._previous_value = None
-        self._previous_time = None
-
-        self._polling_active = False
-        self._flow_task = None
-        self._skip_handle_update_calc = False
-        self._initial_poll_skip = False
-        self._flow_history = collections.deque(maxlen=3) #Mittelwertbildung über X Werte
-
-    async def _poll_water_total_task(self):
-        """Fragt water_total alle 10s ab und berechnet Durchfluss."""
-        log.debug("Starte 10s Polling für water_total")
-
-        rest_item = next((i for i in self.coordinator._restitems if i.translation_key == "water_total"), None)
-        if not rest_item:
-            log.warning("RestItem water_total nicht gefunden")
-            return
-
-        ro = RestObject(self._rest_api, rest_item)
-        #log.warn("10s Task: ro_value: %s", ro)
-
-        try:
-            while self._polling_active:
-                if self._initial_poll_skip:
-                    raw_value = self.coordinator.get_value_from_item("water_total")
-                    log.debug("10s Task: update water_total VOM Coordinator: %s", raw_value)
-                else:
-                    raw_value = await ro.value #ruft den wert über die api ab (nur water_total!) und wandelt ihn direkt um
-                    if raw_value is not None:
-                        rest_item.state = raw_value
-                        log.debug("10s Task: update water_total ZUM coordinator: %s", raw_value)
-
-                if raw_value is not None:
-                    current_value = raw_value * 1000
-                    #log.debug("10s Task: check raw value nach Abruf: %s", current_value)
-                else:
-                    current_value = None
-
-                current_time = time.time()
-
-                log.debug("10s:current_value: %s", current_value)
-                log.debug("10s:previous_value: %s", self._previous_value)
-
-                if (
-                    self._previous_value is not None
-                    and current_value is not None
-                    and current_value != self._previous_value
-                ):
-                    time_diff = current_time - self._previous_time
-                    value_diff = current_value - self._previous_value
-                    flow_rate = (value_diff / time_diff) * 60
-
-                    # Mittelwertbildung
-                    self._flow_history.append(flow_rate)
-                    if len(self._flow_history) > 1:
-                        avg_flow = sum(self._flow_history) / len(self._flow_history)
-                        self._attr_native_value = avg_flow
-                        log.debug("10s Task: avg_flow: %s", avg_flow)
-                    else:
-                        self._attr_native_value = flow_rate  # erster Wert ungeglättet
-
-                    #self._attr_native_value = flow_rate
-                    log.debug("10s Task: flow_rate: %s", flow_rate)
-                    log.debug("10s Task: value_diff: %s", value_diff)
-                    log.debug("10s Task: time_diff: %s", time_diff)
-                    self._previous_value = current_value 
-                    self._previous_time = current_time  
-                    self._initial_poll_skip = False
-                    self.async_write_ha_state() 
-
-                elif current_value == self._previous_value:
-                    log.debug("Kein Unterschied mehr bei water_total, stoppe 10s Task")
-                    self._attr_native_value = 0
-                    self._polling_active = False
-                    self._skip_handle_update_calc = False
-                    self._initial_poll_skip = False
-                    self._previous_value = current_value
-                    self._previous_time = current_time
-                    self._flow_history.clear()  # Verlauf Mittelwertbildung zurücksetzen  
-                    self.async_write_ha_state() 
-                    return
-
-                await asyncio.sleep(11)
-
-        except Exception as e:
-            log.error("Fehler im 10s Task: %s", e)
-            self._polling_active = False
-            self._skip_handle_update_calc = False
-            self._initial_poll_skip = False
-            self._flow_history.clear()   # Verlauf Mittelwertbildung zurücksetzen 
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        current_time = time.time()
-        raw_value = self.coordinator.get_value_from_item("water_total")
-        if raw_value is not None:
-            current_value = raw_value * 1000
-        else:
-            current_value = None
-
-        #log.warn("Coordinator_start: current_time: %s", current_time)
-        #log.warn("Coordinator_start: current_value: %s", current_value)
-        #log.warn("Coordinator_start: previous_time: %s", self._previous_time)
-        #log.warn("Coordinator_start: previous_value: %s", self._previous_value)
-
-        flow_check = self.coordinator.get_value_from_item("water_flow_check_on_off")
-        #log.warn("switch status entities: %s", flow_check)
-
-        if flow_check:
-            if (
-                self._previous_value is not None
-                and current_value is not None
-                and current_value != self._previous_value
-            ):
-                # Änderung erkannt → 10s Task starten
-                if not self._polling_active:
-                    self._polling_active = True
-                    self._skip_handle_update_calc = True
-                    self._initial_poll_skip = True
-                    self._flow_task = asyncio.create_task(self._poll_water_total_task())
-                    log.debug("Änderung erkannt, wechsle zu 10s Polling-Modus")
-
-            if not self._skip_handle_update_calc:
-                # Berechnung weiterhin im coordinator erlaubt
-                if self._previous_value is not None and current_value is not None:
-                    time_diff = current_time - self._previous_time
-                    value_diff = current_value - self._previous_value
-                    flow_rate = (value_diff / time_diff) * 60
-                    self._attr_native_value = flow_rate
-                    #log.warn("Coordinator-Update: flow_rate: %s", flow_rate)
-                    #log.warn("Coordinator-Update: value_diff: %s", value_diff)
-                    #log.warn("Coordinator-Update: time_diff: %s", time_diff)
-                    self._previous_value = current_value
-                    self._previous_time = current_time 
-                    self.async_write_ha_state()
-                else:
-                    self._attr_native_value = 0
-            else:
-                log.debug("Berechnung aktuell deaktiviert (läuft über 10s-Task)")
-        else:
-            self._attr_native_value = 0 #Update mycalcsensor (water_flow)
-            self._polling_active = False
-            self._skip_handle_update_calc = False
-            self._initial_poll_skip = False
-            self._previous_value = current_value #Initialisierung ansonsten ist es none
-            self._previous_time = current_time 
-            self.async_write_ha_state() #Update mycalcsensor HA (water_flow)
-
-        #log.warn("Coordinator-Update: skip_handle_update_calc: %s", self._skip_handle_update_calc)
-        #log.warn("Coordinator-Update: polling_active: %s", self._polling_active)
-        #log.warn("Coordinator_end: current_time: %s", current_time)
-        #log.warn("Coordinator_end: current_value: %s", current_value)
-        #log.warn("Coordinator_end: previous_time: %s", self._previous_time)
-        #log.warn("Coordinator_end: previous_value: %s", self._previous_value)
+        self._attr_native_value = self.coordinator.get_state(self.idx)
+        self.async_write_if_changed(self._attr_native_value)
 
     @property
     def device_info(self) -> DeviceInfo:
         """Return device info."""
         return MyEntity.my_device_info(self)
-
-####################################################################################
-########Alter Versuch######Update der kompletten Werte über den Coordinator#########
-####Bei Verwendung auch Code im Coordniator einblenden Zeile 118-128########
-####################################################################################
-#class MyCalcSensorEntity(CoordinatorEntity, SensorEntity, MyEntity):
-#    """Class that represents a calculated sensor entity."""
-#
-#    def __init__(self, config_entry: MyConfigEntry, rest_item: RestItem, coordinator: MyCoordinator, idx) -> None:
-#        """Initialize of MyCalcSensorEntity."""
-#        super().__init__(coordinator, context=idx)
-#        self.idx = idx
-#        MyEntity.__init__(self, config_entry, rest_item, coordinator.rest_api)
-#        self._previous_value = None
-#        self._previous_time = None
-#
-#    @callback
-#    def _handle_coordinator_update(self) -> None:
-#        """#Handle updated data from the coordinator."""
-#        current_time = time.time()
-#        raw_value = self.coordinator.get_value_from_item("water_total")
-#        if raw_value is not None:
-#            current_value = raw_value * 1000
-#        else:
-#            current_value = None
-#        log.debug("current_time: %s", current_time)
-#        log.debug("current_value: %s", current_value)
-#        log.debug("previous_time: %s", self._previous_time)
-#        log.debug("previous_value: %s", self._previous_value)
-#
-#        flow_check = self.coordinator.get_value_from_item("water_flow_check_on_off")
-#        log.debug("switch status entities: %s", flow_check)
-#        if flow_check:
-#            if self._previous_value is not None and current_value is not None:
-#                time_diff = current_time - self._previous_time
-#                value_diff = current_value - self._previous_value
-#                flow_rate = (value_diff / time_diff) * 60  # l/min   #Achtung wenn original dann in mynumber zeile raus!!
-#                self._attr_native_value = flow_rate
-#                log.debug("time_diff: %s", time_diff)
-#                log.debug("value_diff: %s", value_diff)
-#                log.debug("flow_rate: %s", flow_rate)
-#            else:
-#                self._attr_native_value = 0
-#
-#        else:
-#            self._attr_native_value = 0
-#        self._previous_value = current_value
-#        self._previous_time = current_time
-#        self.async_write_ha_state()
-#
-#    @property
-#    def device_info(self) -> DeviceInfo:
-#        """Return device info."""
-#        return MyEntity.my_device_info(self)
-##############################################################
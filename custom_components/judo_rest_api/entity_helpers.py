@@ -11,63 +11,86 @@ logging.basicConfig()
 log = logging.getLogger(__name__)
 
 
-async def build_entity_list(
-    entries,
-    config_entry: MyConfigEntry,
-    rest_items: RestItem,
-    item_type,
-    coordinator: MyCoordinator,
-):
+# platform of the entities of each item type
+PLATFORM_BY_TYPE = {
+    TYPES.SENSOR: "sensor",
+    TYPES.NUMBER_RO: "sensor",
+    TYPES.SENSOR_CALC: "sensor",
+    TYPES.SELECT: "select",
+    TYPES.SELECT_NOIF: "select",
+    TYPES.NUMBER: "number",
+    TYPES.SWITCH: "switch",
+    TYPES.BUTTON: "button",
+}
+
+
+def classify_items(rest_items: list[RestItem]) -> dict[str, list[RestItem]]:
+    """Bucket the items by platform in one pass.
+
+    Called once at setup, the result is kept on the runtime data of the entry.
+
+    :param rest_items: all items of the config entry
+    :returns: dict of platform -> items of that platform
+    """
+    buckets: dict[str, list[RestItem]] = {
+        platform: [] for platform in PLATFORM_BY_TYPE.values()
+    }
+    for item in rest_items:
+        platform = PLATFORM_BY_TYPE.get(item.type)
+        if platform is not None:
+            buckets[platform].append(item)
+    return buckets
+
+
+def build_entity_list(config_entry: MyConfigEntry, platform: str) -> list:
     """Build entity list.
 
-    function builds a list of entities that can be used as parameter by async_setup_entry()
-    type of list is defined by the RestItem's type flag
-    so the app only holds one list of entities that is build from a list of RestItem
-    stored in hpconst.py so far, will be provided by an external file in future
+    function builds the list of entities of one platform that can be used as
+    parameter by async_setup_entry(), from the bucket of the platform that
+    classify_items() built at setup
 
     :param config_entry: HASS config entry
     :type config_entry: MyConfigEntry
-    :param rest_item: definition of rest item
-    :type rest_item: RestItem
-    :param item_type: type of rest item
-    :type item_type: TYPES
+    :param platform: platform of the entities, e.g. "sensor"
+    :type platform: str
+    """
+    coordinator = config_entry.runtime_data.coordinator
+    return [
+        create_entity(config_entry, item, coordinator)
+        for item in config_entry.runtime_data.items_by_platform[platform]
+    ]
+
+
+def create_entity(
+    config_entry: MyConfigEntry, item: RestItem, coordinator: MyCoordinator
+):
+    """Create the entity of one item.
+
+    Single place where entities are constructed, e.g. to defer the
+    construction of items that are disabled by default.
+
+    :param config_entry: HASS config entry
+    :type config_entry: MyConfigEntry
+    :param item: definition of rest item
+    :type item: RestItem
     :param coordinator: the update coordinator
     :type coordinator: MyCoordinator
     """
-
-    for index, item in enumerate(rest_items):
-        if item.type == item_type:
-            match item_type:
-                # here the entities are created with the parameters provided
-                # by the RestItem object
-                case TYPES.SENSOR | TYPES.NUMBER_RO:
-                    entries.append(
-                        MySensorEntity(config_entry, item, coordinator, index)
-                    )
-                case TYPES.SENSOR_CALC:
-                    entries.append(
-                        MyCalcSensorEntity(
-                            config_entry,
-                            item,
-                            coordinator,
-                            index,
-                        )
-                    )
-                case TYPES.SELECT | TYPES.SELECT_NOIF:
-                    entries.append(
-                        MySelectEntity(config_entry, item, coordinator, index)
-                    )
-                case TYPES.NUMBER:
-                    entries.append(
-                        MyNumberEntity(config_entry, item, coordinator, index)
-                    )
-                case TYPES.SWITCH:
-                    entries.append(
-                        MySwitchEntity(config_entry, item, coordinator, index)
-                    )
-                case TYPES.BUTTON:
-                    entries.append(
-                        MyButtonEntity(config_entry, item, coordinator, index)
-                    )
-
-    return entries
+    # the entity context is the position in the coordinator's item list
+    index = coordinator.item_index(item)
+    match item.type:
+        # here the entities are created with the parameters provided
+        # by the RestItem object
+        case TYPES.SENSOR | TYPES.NUMBER_RO:
+            return MySensorEntity(config_entry, item, coordinator, index)
+        case TYPES.SENSOR_CALC:
+            return MyCalcSensorEntity(config_entry, item, coordinator, index)
+        case TYPES.SELECT | TYPES.SELECT_NOIF:
+            return MySelectEntity(config_entry, item, coordinator, index)
+        case TYPES.NUMBER:
+            return MyNumberEntity(config_entry, item, coordinator, index)
+        case TYPES.SWITCH:
+            return MySwitchEntity(config_entry, item, coordinator, index)
+        case TYPES.BUTTON:
+            return MyButtonEntity(config_entry, item, coordinator, index)
+    return None
@@ -0,0 +1,107 @@
+"""Rate estimation for counters.
+
+Estimates the rate of a monotonic counter, e.g. water_total, from timestamped
+samples. The timestamp is the monotonic time at which the register was read,
+not the time at which Home Assistant handles the update.
+"""
+
+from collections import deque
+
+from .const import SMOOTHING
+
+
+class RateEstimator:
+    """Estimates the rate of a counter in units per second.
+
+    The counter only changes in steps of its resolution. A single interval
+    therefore shows either nothing or a whole step, so the smoothing runs over
+    several samples. While the counter stands still, the rate can not be higher
+    than one step since the last change.
+    """
+
+    def __init__(
+        self,
+        method: str = SMOOTHING.WINDOW,
+        window: int = 3,
+        alpha: float = 0.5,
+        resolution: float = 1,
+    ) -> None:
+        """Construct RateEstimator.
+
+        :param method: SMOOTHING.WINDOW, SMOOTHING.EWMA or SMOOTHING.REGRESSION
+        :param window: number of intervals the rate is smoothed over
+        :param alpha: weight of the newest interval for SMOOTHING.EWMA
+        :param resolution: smallest step of the counter
+        """
+        self._method = method
+        self._window = max(1, int(window))
+        self._alpha = alpha
+        self._resolution = resolution
+        self._samples: deque[tuple[float, float]] = deque(maxlen=self._window + 1)
+        self._last_change: float | None = None
+        self._rate = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Return the current rate in units per second."""
+        return self._rate
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        self._samples.clear()
+        self._last_change = None
+        self._rate = 0.0
+
+    def add_sample(self, timestamp: float, value: float) -> float:
+        """Add a sample of the counter and return the new rate.
+
+        :param timestamp: monotonic time at which the counter was read
+        :param value: value of the counter
+        :returns: rate in units per second
+        """
+        if self._samples:
+            last_time, last_value = self._samples[-1]
+            if timestamp <= last_time:
+                return self._rate
+            if value < last_value:
+                # counter was reset or replaced
+                self.reset()
+            elif value != last_value:
+                self._last_change = timestamp
+        self._samples.append((timestamp, value))
+
+        if len(self._samples) < 2:
+            self._rate = 0.0
+            return self._rate
+        if self._samples[0][1] == self._samples[-1][1]:
+            # no step within the whole window
+            self._rate = 0.0
+            return self._rate
+
+        match self._method:
+            case SMOOTHING.EWMA:
+                (t0, v0), (t1, v1) = self._samples[-2], self._samples[-1]
+                rate = (v1 - v0) / (t1 - t0)
+                rate = self._alpha * rate + (1 - self._alpha) * self._rate
+            case SMOOTHING.REGRESSION:
+                rate = self._slope()
+            case _:
+                (t0, v0), (t1, v1) = self._samples[0], self._samples[-1]
+                rate = (v1 - v0) / (t1 - t0)
+
+        if self._last_change is not None and self._samples[-1][1] == self._samples[-2][1]:
+            # standing still: less than one step since the last change
+            rate = min(rate, self._resolution / (timestamp - self._last_change))
+        self._rate = max(rate, 0.0)
+        return self._rate
+
+    def _slope(self) -> float:
+        """Return the least squares slope of the samples."""
+        count = len(self._samples)
+        mean_t = sum(t for t, _ in self._samples) / count
+        mean_v = sum(v for _, v in self._samples) / count
+        var_t = sum((t - mean_t) ** 2 for t, _ in self._samples)
+        if var_t == 0:
+            return 0.0
+        cov = sum((t - mean_t) * (v - mean_v) for t, v in self._samples)
+        return cov / var_t
@@ -0,0 +1,138 @@
+"""Integration wide hub.
+
+The hub is shared by all Judo config entries. It owns the HTTP connection pool,
+limits the number of requests that run at the same time across all devices,
+spreads the poll phases of the entries and collects throughput and latency stats.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .const import CONST
+
+logging.basicConfig()
+log = logging.getLogger(__name__)
+
+# spreads the poll phases of an unknown number of entries evenly
+GOLDEN_RATIO_FRACTION = 0.6180339887
+
+
+class JudoHub:
+    """Hub shared by all config entries of the integration."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Construct JudoHub.
+
+        :param hass: HomeAssistant instance
+        :type hass: HomeAssistant
+        """
+        self._hass = hass
+        self._session = None
+        self._semaphore = asyncio.Semaphore(CONST.HUB_MAX_CONCURRENT_REQUESTS)
+        self._slots: dict[str, int] = {}
+        self._started = time.monotonic()
+        self._requests = 0
+        self._errors = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the keep-alive session shared by all entries.
+
+        Basic auth is passed per request, so one connection pool serves all devices.
+        """
+        if self._session is None or self._session.closed:
+            self._session = async_create_clientsession(self._hass)
+        return self._session
+
+    def register(self, entry_id: str) -> None:
+        """Register a config entry at the hub."""
+        if entry_id in self._slots:
+            return
+        used = set(self._slots.values())
+        slot = 0
+        while slot in used:
+            slot += 1
+        self._slots[entry_id] = slot
+
+    def unregister(self, entry_id: str) -> None:
+        """Remove a config entry from the hub."""
+        self._slots.pop(entry_id, None)
+
+    @property
+    def empty(self) -> bool:
+        """Return True if no config entry uses the hub any more."""
+        return not self._slots
+
+    def poll_phase(self, entry_id: str, interval: float) -> float:
+        """Return the delay until the next poll of an entry in its own phase.
+
+        The phases count from the start of the hub, so they hold between
+        entries that were set up at different times.
+
+        :param entry_id: id of the config entry
+        :param interval: poll interval of the entry in seconds
+        :returns: delay in seconds until the next poll of the entry
+        """
+        slot = self._slots.get(entry_id, 0)
+        phase = self._started + ((slot * GOLDEN_RATIO_FRACTION) % 1) * interval
+        return (phase - time.monotonic()) % interval
+
+    @asynccontextmanager
+    async def request_slot(self):
+        """Acquire a slot of the global request budget and time the request."""
+        async with self._semaphore:
+            start = time.monotonic()
+            success = False
+            try:
+                yield
+                success = True
+            finally:
+                self._record(time.monotonic() - start, success)
+
+    def _record(self, latency: float, success: bool) -> None:
+        """Add one request to the stats."""
+        self._requests += 1
+        if not success:
+            self._errors += 1
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+
+    @property
+    def stats(self) -> dict:
+        """Return aggregate throughput and latency stats of all entries."""
+        runtime = max(time.monotonic() - self._started, 1e-3)
+        latency_avg = 0.0
+        if self._requests:
+            latency_avg = self._latency_total / self._requests
+        return {
+            "entries": len(self._slots),
+            "requests": self._requests,
+            "errors": self._errors,
+            "requests_per_minute": self._requests * 60 / runtime,
+            "latency_avg": latency_avg,
+            "latency_max": self._latency_max,
+        }
+
+    async def close(self) -> None:
+        """Close the shared connection pool."""
+        log.debug("Judo hub stats: %s", self.stats)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def get_hub(hass: HomeAssistant) -> JudoHub:
+    """Return the hub of the integration, create it on first use."""
+    hub = hass.data.get(CONST.DOMAIN)
+    if hub is None:
+        hub = JudoHub(hass)
+        hass.data[CONST.DOMAIN] = hub
+    return hub
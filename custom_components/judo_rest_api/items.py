@@ -1,6 +1,16 @@
 """Item classes."""
 
-from .const import DeviceConstants, FormatConstants, TypeConstants
+from .const import FORMATS, DeviceConstants, FormatConstants, TypeConstants
+from .decoders import Decoder, build_decoder
+
+# formats that are never read from the REST API
+NOT_READABLE_FORMATS = (
+    FORMATS.BUTTON,
+    FORMATS.NUMBER_WO,
+    FORMATS.NUMBER_INTERNAL,
+    FORMATS.SWITCH_INTERNAL,
+    FORMATS.STATUS_WO,
+)
 
 
 class StatusItem:
@@ -8,8 +18,12 @@ class StatusItem:
 
     A class is intentionally defined here because the assignment via dictionaries would not work so elegantly in the end,
     especially when searching backwards. (At least I don't know how...)
+
+    Status items are static definitions shared by all config entries, so they are read-only.
     """
 
+    __slots__ = ("_number", "_translation_key")
+
     def __init__(
         self,
         number: int,
@@ -24,28 +38,39 @@ class StatusItem:
         """Return number."""
         return self._number
 
-    @number.setter
-    def number(self, value: int) -> None:
-        """Set number."""
-        self._number = value
-
     @property
     def translation_key(self) -> str:
         """Return translation_key."""
         return self._translation_key
 
-    @translation_key.setter
-    def translation_key(self, val: str) -> None:
-        """Set translation_key."""
-        self._translation_key = val
-
 
 class RestItem:
     """Class ApiIem item.
 
     This can either be a RestItem or a WebifItem
+
+    The register definition is read-only and shared by all config entries,
+    the runtime state lives in the per-entry store of MyCoordinator.
     """
 
+    __slots__ = (
+        "_translation_key",
+        "_address_read",
+        "_read_index",
+        "_read_bytes",
+        "_address_write",
+        "_write_index",
+        "_write_bytes",
+        "_format",
+        "_type",
+        "_device",
+        "_resultlist",
+        "_params",
+        "_number_to_key",
+        "_key_to_number",
+        "_decoder",
+    )
+
     def __init__(
         self,
         translation_key: str,
@@ -74,26 +99,37 @@ class RestItem:
         self._device = device
         self._resultlist = resultlist
         self._params = params
-        self._state = None
+        # lookup tables of the resultlist, the first entry wins on duplicates
+        self._number_to_key: dict[int, str] = {}
+        self._key_to_number: dict[str, int] = {}
+        if resultlist is not None:
+            for item in resultlist:
+                self._number_to_key.setdefault(item.number, item.translation_key)
+                self._key_to_number.setdefault(item.translation_key, item.number)
+        divider = 1
+        if params is not None:
+            divider = params.get("divider", 1)
+        # compiled once, so a read does not re-parse the format on every scan
+        self._decoder = build_decoder(
+            mformat,
+            read_index,
+            read_bytes,
+            divider=divider,
+            number_to_key=self.get_translation_key_from_number,
+            name=translation_key,
+        )
 
     @property
     def params(self) -> dict:
         """Return state."""
         return self._params
 
-    @params.setter
-    def params(self, val: dict):
-        self._params = val
-
     @property
-    def state(self):
-        """Return the state of the item set by restobject."""
-        return self._state
-
-    @state.setter
-    def state(self, val):
-        """Set the state of the item from rest."""
-        self._state = val
+    def poll_interval(self) -> int | None:
+        """Return the poll interval in seconds, None polls with every scan."""
+        if self._params is None:
+            return None
+        return self._params.get("poll_interval", None)
 
     @property
     def format(self) -> FormatConstants:
@@ -110,21 +146,11 @@ class RestItem:
         """Return device."""
         return self._device
 
-    @device.setter
-    def device(self, val: DeviceConstants):
-        """Return device."""
-        self._device = val
-
     @property
     def translation_key(self) -> str:
         """Return translation_key."""
         return self._translation_key
 
-    @translation_key.setter
-    def translation_key(self, val: str) -> None:
-        """Set translation_key."""
-        self._translation_key = val
-
     @property
     def resultlist(self):
         """Return resultlist."""
@@ -136,78 +162,62 @@ class RestItem:
             return None
         if self._resultlist is None:
             return None
-        for _useless, item in enumerate(self._resultlist):
-            if val == item.number:
-                return item.translation_key
-        return "unbekannt <" + str(val) + ">"
+        key = self._number_to_key.get(val)
+        if key is None:
+            return "unbekannt <" + str(val) + ">"
+        return key
+
+    def get_number_from_translation_key(self, val: str, default: int = -1) -> int:
+        """Get number of coresponding errortext.
 
-    def get_number_from_translation_key(self, val: str) -> int:
-        """Get number of coresponding errortext."""
+        :param default: returned if the errortext is not in the resultlist
+        """
         if val is None:
             return None
         if self._resultlist is None:
             return None
-        for _useless, item in enumerate(self._resultlist):
-            if val == item.translation_key:
-                return item.number
-        return -1
+        return self._key_to_number.get(val, default)
+
+    @property
+    def decoder(self) -> Decoder:
+        """Return the decoder that reads the item from a register payload."""
+        return self._decoder
+
+    @property
+    def readable(self) -> bool:
+        """Return True if the item is read from the REST API."""
+        return (
+            self._address_read is not None
+            and self._format not in NOT_READABLE_FORMATS
+        )
 
     @property
     def address_read(self) -> int:
         """Return address."""
         return self._address_read
 
-    @address_read.setter
-    def address_read(self, val: int):
-        """Set address."""
-        self._address_read = val
-
     @property
     def read_index(self) -> int:
         """Return address."""
         return self._read_index
 
-    @read_index.setter
-    def read_index(self, val: int):
-        """Set address."""
-        self._read_index = val
-
     @property
     def read_bytes(self) -> int:
         """Return address."""
         return self._read_bytes
 
-    @read_bytes.setter
-    def read_bytes(self, val: int):
-        """Set address."""
-        self._read_bytes = val
-
     @property
     def address_write(self) -> int:
         """Return address."""
         return self._address_write
 
-    @address_write.setter
-    def address_write(self, val: int):
-        """Set address."""
-        self._address_write = val
-
     @property
     def write_index(self) -> int:
         """Return address."""
         return self._write_index
 
-    @write_index.setter
-    def write_index(self, val: int):
-        """Set address."""
-        self._write_index = val
-
     @property
     def write_bytes(self) -> int:
         """Return address."""
         return self._write_bytes
 
-    @write_bytes.setter
-    def write_bytes(self, val: int):
-        """Set address."""
-        self._write_bytes = val
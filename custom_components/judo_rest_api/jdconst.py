@@ -8,7 +8,7 @@ from homeassistant.const import (
     UnitOfTime,
 )
 
-from .const import DEVICES, FORMATS, TYPES
+from .const import CONST, DEVICES, FORMATS, SMOOTHING, TYPES
 from .items import RestItem, StatusItem
 
 reverse_device_list: dict[str, str] = {
@@ -185,6 +185,8 @@ AUTO_MICROLEAKAGECHECK_LIST: list[StatusItem] = [
 ]
 #####################################################
 # Description of physical units via the status list #
+# "poll_interval": seconds between two reads,       #
+# CONST.POLL_ONCE = read once, missing = every scan #
 #####################################################
 
 PARAMS_FLOWRATE: dict = {
@@ -214,7 +216,11 @@ PARAMS_FLOWRATE3: dict = {
     "precision": 2,
     "unit": UnitOfVolumeFlowRate.LITERS_PER_MINUTE,
     "stateclass": SensorStateClass.MEASUREMENT,
-    "icon": "mdi:waves-arrow-right"
+    "icon": "mdi:waves-arrow-right",
+    "smoothing": SMOOTHING.WINDOW,  # or SMOOTHING.EWMA, SMOOTHING.REGRESSION
+    "window": 3,  # number of intervals
+    "alpha": 0.5,  # weight of the newest interval for SMOOTHING.EWMA
+    "resolution": 1  # liters, smallest step of water_total
 }
 
 PARAMS_FLOW: dict = {
@@ -257,7 +263,8 @@ PARAMS_DAYS: dict = {
     "preciosion": 0,
     "unit": "Tage",
     "stateclass": SensorStateClass.MEASUREMENT,
-    "icon": "mdi:timelapse"
+    "icon": "mdi:timelapse",
+    "poll_interval": 3600
 }
 
 PARAMS_MINUTES: dict = {
@@ -370,7 +377,8 @@ PARAMS_RESET: dict = {
     "icon":"mdi:lock-reset",
 }
 PARAMS_INFO: dict = {
-    "icon": "mdi:information-box-outline"
+    "icon": "mdi:information-box-outline",
+    "poll_interval": CONST.POLL_ONCE
 }
 PARAMS_SWITCH_WF: dict = {
     "icon": "mdi:toggle-switch-outline"
@@ -438,6 +446,12 @@ DEVICELISTS: list = [
     REST_ST_ITEMS,
 ]
 
+# Items that are derived from other items. When only a part of the items is
+# refreshed, the items listed here are fetched along with the derived item.
+ITEM_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "water_flow": ("water_total", "water_flow_check_on_off"),
+}
+
 # fmt: on
 # DO
 # - Format für SW siehe GIT HUB
@@ -4,31 +4,55 @@ A REST object that contains a REST item and communicates with the REST-API.
 It contains a REST Client for setting and getting REST response values
 """
 
+import asyncio
+import contextlib
+import heapq
+import itertools
 import logging
-from datetime import datetime
-from functools import partial
-import requests
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+import aiohttp
 from homeassistant.core import HomeAssistant
 
 from .configentry import MyConfigEntry
-from .const import DEVICETYPES, FORMATS, CONF, TYPES
+from .const import CONST, DEVICETYPES, FORMATS, CONF, PRIORITY, TYPES
+from .hub import JudoHub
 from .items import RestItem
 
 logging.basicConfig()
 log = logging.getLogger(__name__)
 
 
+@dataclass
+class PendingWrite:
+    """Write that waits for further values of the same command."""
+
+    # hex payload that will be sent
+    towrite: str
+    # resolved with the response of the device once the write was sent
+    future: asyncio.Future
+    # set to send the write before the debounce window has passed
+    flush: asyncio.Event = field(default_factory=asyncio.Event)
+
+
 class RestAPI:
     """
     RestAPI class that provides a connection to the rest api,
     which is used by the RestItems.
     """
 
-    def __init__(self, config_entry: MyConfigEntry, hass: HomeAssistant) -> None:
+    def __init__(
+        self, config_entry: MyConfigEntry, hass: HomeAssistant, hub: JudoHub
+    ) -> None:
         """Construct RestAPI.
 
         :param config_entry: HASS config entry
         :type config_entry: MyConfigEntry
+        :param hub: integration wide hub that owns the connection pool
+        :type hub: JudoHub
         """
         self._ip = config_entry.data[CONF.HOST]
         self._port = config_entry.data[CONF.PORT]
@@ -48,79 +72,407 @@ class RestAPI:
         )
         self._api_url = self._base_url + "/api/rest/"
         self._devicetype = None
-        self._session = None
+        self._hub = hub
+        self._auth = aiohttp.BasicAuth(self._username, self._password)
         self._connected = False
+        # circuit breaker for an unreachable device
+        self._failures = 0
+        self._open_until = None
+        self._backoff = CONST.BREAKER_BACKOFF_MIN
+        self._probe_lock = asyncio.Lock()
+        # writes waiting for CONST.WRITE_DEBOUNCE, by command
+        self._writes: dict[str, PendingWrite] = {}
+        # writes handed to the queue, not yet answered by the device
+        self._sending: dict[str, PendingWrite] = {}
+        # command queue of the device: (priority, sequence, waiter)
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        # a write is in flight, nothing else is sent
+        self._writing = False
+        # the connectivity module is fragile, 1 sends one command after another
+        self._queue_width = max(
+            1,
+            int(
+                config_entry.data.get(
+                    CONF.MAX_CONCURRENT_REQUESTS, CONST.MAX_CONCURRENT_REQUESTS
+                )
+            ),
+        )
+        self._queued = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the keep-alive session of the hub.
+
+        The connection pool is shared by all entries and reused across a whole scan.
+        """
+        return self._hub.session
 
     async def login(self) -> None:
         """Log into the portal. Create cookie to stay logged in for the session."""
 
-        _useless = await self._hass.async_add_executor_job(
-            partial(
-                requests.get,
-                url=self._base_url,
-                auth=(self._username, self._password),
-                timeout=10,
+        async with (
+            self._command_slot(PRIORITY.READ),
+            self.session.get(
+                self._base_url,
+                auth=self._auth,
+                timeout=self.request_timeout(CONST.READ_TIMEOUT),
+            ) as response,
+        ):
+            await response.read()
+
+    @asynccontextmanager
+    async def _command_slot(self, priority: int):
+        """Wait for the turn of a command in the queue of the device.
+
+        At most max_concurrent_requests reads are sent at the same time, a
+        write is always sent alone. Waiting commands are sent by priority,
+        then in the order they arrived, so writes jump ahead of the reads of
+        a running scan.
+
+        :param priority: PRIORITY.WRITE, PRIORITY.READ or PRIORITY.SCAN
+        """
+        enqueued = time.monotonic()
+        if not self._queue and self._admissible(priority):
+            self._acquire(priority)
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # the slot was already handed over to this command
+                    self._release_slot(priority)
+                raise
+        wait = time.monotonic() - enqueued
+        self._queued += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        try:
+            async with self._hub.request_slot():
+                yield
+        finally:
+            self._release_slot(priority)
+
+    def _admissible(self, priority: int) -> bool:
+        """Return True if a command of this priority may be sent now."""
+        if self._writing:
+            return False
+        if priority == PRIORITY.WRITE:
+            # reads and writes do not interleave on the device
+            return self._in_flight == 0
+        return self._in_flight < self._queue_width
+
+    def _acquire(self, priority: int) -> None:
+        """Take a slot of the queue for a command."""
+        self._in_flight += 1
+        if priority == PRIORITY.WRITE:
+            self._writing = True
+
+    def _release_slot(self, priority: int) -> None:
+        """Free the slot of a finished command and wake the next commands."""
+        self._in_flight -= 1
+        if priority == PRIORITY.WRITE:
+            self._writing = False
+        while self._queue:
+            next_priority, _sequence, waiter = self._queue[0]
+            if waiter.done():
+                heapq.heappop(self._queue)
+                continue
+            if not self._admissible(next_priority):
+                # the first command waits for the running ones, the others
+                # do not overtake it
+                return
+            heapq.heappop(self._queue)
+            self._acquire(next_priority)
+            waiter.set_result(None)
+
+    @property
+    def queue_stats(self) -> dict:
+        """Return depth and wait time stats of the command queue."""
+        wait_avg = 0.0
+        if self._queued:
+            wait_avg = self._wait_total / self._queued
+        return {
+            "depth": sum(1 for *_, waiter in self._queue if not waiter.done()),
+            "in_flight": self._in_flight,
+            "commands": self._queued,
+            "wait_avg": wait_avg,
+            "wait_max": self._wait_max,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return False while the circuit breaker is open."""
+        return self._open_until is None
+
+    def _record_success(self) -> None:
+        """Close the circuit breaker after a successful request."""
+        if self._open_until is not None:
+            log.info("Judo Zewa reachable again")
+        self._failures = 0
+        self._open_until = None
+        self._backoff = CONST.BREAKER_BACKOFF_MIN
+
+    def _record_failure(self) -> None:
+        """Open the circuit breaker after too many consecutive failures."""
+        self._failures += 1
+        if self._open_until is None and self._failures >= CONST.BREAKER_THRESHOLD:
+            log.warning(
+                "Judo Zewa not reachable after %d failed requests, retry in %d s",
+                self._failures,
+                self._backoff,
+            )
+            self._open_until = time.monotonic() + self._backoff
+
+    async def _probe(self) -> bool:
+        """Probe the device with the cheap FF00 request while the breaker is open.
+
+        :returns: True if the device answered and the breaker is closed again
+        """
+        async with self._probe_lock:
+            if self._open_until is None:
+                return True
+            if time.monotonic() < self._open_until:
+                return False
+            if await self._get("FF00", priority=PRIORITY.READ) is not None:
+                return True
+            self._backoff = min(self._backoff * 2, CONST.BREAKER_BACKOFF_MAX)
+            self._open_until = time.monotonic() + self._backoff
+            log.debug("Judo Zewa still not reachable, retry in %d s", self._backoff)
+            return False
+
+    @staticmethod
+    def request_timeout(
+        read_timeout: float, deadline: float | None = None
+    ) -> aiohttp.ClientTimeout | None:
+        """Derive the timeouts of one request from the remaining budget.
+
+        :param read_timeout: timeout for reading the response
+        :param deadline: monotonic time at which the budget of the scan ends
+        :returns: the timeouts, None if the budget is used up
+        """
+        if deadline is None:
+            return aiohttp.ClientTimeout(
+                connect=CONST.CONNECT_TIMEOUT, sock_read=read_timeout
             )
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        return aiohttp.ClientTimeout(
+            total=remaining,
+            connect=min(CONST.CONNECT_TIMEOUT, remaining),
+            sock_read=min(read_timeout, remaining),
         )
 
-        # r = requests.get(self._base_url, auth=(self._username, self._password), timeout=10 )
-        # log.warning(r.text)
+    async def get_rest(
+        self,
+        command: str,
+        deadline: float | None = None,
+        priority: int = PRIORITY.READ,
+    ):
+        """get raw response from REST api
+
+        While the circuit breaker is open, reads return None without a request.
 
-    async def get_rest(self, command: str):
-        """get raw response from REST api"""
+        :param deadline: monotonic time at which the budget of the scan ends,
+            commands that do not fit into the budget are not sent
+        :param priority: priority of the command in the queue of the device
+        """
         if command is None:
             return None
-        response = None
+        if self._open_until is not None and not await self._probe():
+            return None
+        return await self._get(command, deadline, priority)
+
+    async def _get(
+        self,
+        command: str,
+        deadline: float | None = None,
+        priority: int = PRIORITY.READ,
+    ):
+        """Send one read command and update the circuit breaker."""
+        if self.request_timeout(CONST.READ_TIMEOUT, deadline) is None:
+            log.debug("No budget left for command %s, deferred", command)
+            return None
+        status = "unknown status"
         try:
             log.debug("Send command %s", command)
             url = self._api_url + command
-            response = await self._hass.async_add_executor_job(
-                partial(
-                    requests.get,
-                    url=url,
-                    auth=(self._username, self._password),
-                    timeout=10,
-                )
-            )
-            log.debug("Response %s", response.status_code)
-            status = response.status_code
-            if status == 200:
-                res = await self._hass.async_add_executor_job(response.json)
-                log.debug("Content %s", str(res["data"]))
-                return res["data"]
-            else:
-                log.warning("Content ignored for API return status %s", str(status))
-                return None
+            async with self._command_slot(priority):
+                # derived after waiting in the queue, from what is left
+                timeout = self.request_timeout(CONST.READ_TIMEOUT, deadline)
+                if timeout is None:
+                    log.debug("Budget used up in the queue, %s deferred", command)
+                    return None
+                async with self.session.get(
+                    url, auth=self._auth, timeout=timeout
+                ) as response:
+                    status = response.status
+                    log.debug("Response %s", status)
+                    # the device answered, even if the content is ignored
+                    self._record_success()
+                    if status != 200:
+                        log.warning(
+                            "Content ignored for API return status %s", str(status)
+                        )
+                        return None
+                    # the module does not always send a json content type
+                    res = await response.json(content_type=None)
+            log.debug("Content %s", str(res["data"]))
+            return res["data"]
         except Exception:
-            if response is not None:
-                status = str(response.status_code)
-            else:
-                status = "unknown status"
-            log.warning("Judo REST API call failed with %s", status)
+            if status == "unknown status":
+                self._record_failure()
+            if self.available:
+                log.warning("Judo REST API call failed with %s", status)
             return None
 
-    async def write_value(self, command: str, payload: bytes):  #NEU
-        """Write a payload to the REST API."""
+    async def get_rest_batch(
+        self,
+        commands: list[str],
+        timeout: float = 60,
+        on_result: Callable[[str, str], None] | None = None,
+    ) -> dict[str, str | None]:
+        """Read several registers as one unit.
+
+        The commands run over the keep-alive connections of the hub and share
+        one deadline. The command queue of the device decides how many of them
+        are in flight at the same time. Every request gets its connect and read
+        timeouts from the remaining budget. Failed commands are retried once
+        while budget is left, otherwise they are deferred to the next cycle.
+
+        :param commands: commands to be read, e.g. register addresses
+        :param timeout: budget in seconds for the whole batch
+        :param on_result: called with command and response as soon as a
+            command succeeded, so results survive a cancelled batch
+        :returns: dict of command -> raw response, None if the command failed
+        """
+        results: dict[str, str | None] = dict.fromkeys(commands)
+        deadline = time.monotonic() + timeout
+
+        async def _read(command: str) -> None:
+            res = await self.get_rest(command, deadline, PRIORITY.SCAN)
+            results[command] = res
+            if res is not None and on_result is not None:
+                on_result(command, res)
+
+        try:
+            # the per-request timeouts keep the batch within its budget,
+            # this only guards against requests that hang after the deadline
+            async with asyncio.timeout(timeout + CONST.CONNECT_TIMEOUT):
+                await asyncio.gather(*(_read(command) for command in commands))
+                retry = [command for command, res in results.items() if res is None]
+                if retry and self.available:
+                    log.debug("Retry commands %s", retry)
+                    await asyncio.gather(*(_read(command) for command in retry))
+        except TimeoutError:
+            done = sum(1 for res in results.values() if res is not None)
+            log.warning(
+                "Batch read timed out after %s s, %d of %d commands done",
+                str(timeout),
+                done,
+                len(commands),
+            )
+        return results
+
+    async def write_value(
+        self, command: str, payload: bytes, fields: tuple[slice, ...] | None = None
+    ):  #NEU
+        """Write a payload to the REST API.
+
+        :param command: write command, e.g. 5F00
+        :param payload: complete payload of the command
+        :param fields: byte ranges of the payload changed by the caller. A pending
+            or unanswered write of the same command keeps its other bytes, so
+            updates of different fields of a composite command do not revert
+            each other.
+        """
+        pending = self._writes.get(command) or self._sending.get(command)
+        if fields is not None and pending is not None:
+            merged = bytearray.fromhex(pending.towrite)
+            for part in fields:
+                merged[part] = payload[part]
+            payload = bytes(merged)
         hex_payload = payload.hex().upper()
-        await self.set_rest(command, hex_payload)               #BIS hier neu
+        return await self.set_rest(command, hex_payload)               #BIS hier neu
 
     async def set_rest(self, command: str, towrite: str):
-        """write raw response to REST api"""
+        """write raw response to REST api
+
+        Writes of a value to the same command within CONST.WRITE_DEBOUNCE are
+        coalesced, only the last value is sent. All callers get its response.
+        Commands without a payload, e.g. buttons, are sent immediately, after
+        the pending writes, so the device gets them in the order of the user.
+        """
         if command is None: 
             return None     
         if towrite is None: 
             return None     
+        if towrite == "":
+            # values chosen before, e.g. holiday_mode_write before
+            # holiday_mode_off, have to reach the device first
+            await self._flush_writes()
+            return await self._set(command, towrite)
+        pending = self._writes.get(command)
+        if pending is None:
+            pending = PendingWrite(towrite, asyncio.get_running_loop().create_future())
+            self._writes[command] = pending
+            self._hass.async_create_background_task(
+                self._flush_write(command), name="judo_rest_api write " + command
+            )
+        else:
+            log.debug("Coalesce write %s%s into %s", command, pending.towrite, towrite)
+            pending.towrite = towrite
+        # shielded, a cancelled caller does not cancel the write of the others
+        return await asyncio.shield(pending.future)
+
+    async def _flush_write(self, command: str) -> None:
+        """Send the last value written to a command after the debounce window."""
+        pending = self._writes[command]
+        try:
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(CONST.WRITE_DEBOUNCE):
+                    await pending.flush.wait()
+            # values arriving from now on start a new write
+            del self._writes[command]
+            self._sending[command] = pending
+            pending.future.set_result(await self._set(command, pending.towrite))
+        finally:
+            if self._writes.get(command) is pending:
+                del self._writes[command]
+            if self._sending.get(command) is pending:
+                del self._sending[command]
+            if not pending.future.done():
+                pending.future.cancel()
+
+    async def _flush_writes(self) -> None:
+        """Send all pending writes now and wait until they are done."""
+        pending = list(self._writes.values())
+        for write in pending:
+            write.flush.set()
+        await asyncio.gather(
+            *(asyncio.shield(write.future) for write in pending),
+            return_exceptions=True,
+        )
+
+    async def _set(self, command: str, towrite: str):
+        """Send one write command."""
         try:
             url = self._api_url + command + towrite
-            response = await self._hass.async_add_executor_job(
-                partial(
-                    requests.get,
-                    url=url,
-                    auth=(self._username, self._password),
-                    timeout=2,
-                )
-            )
-            res = await self._hass.async_add_executor_job(response.json)
+            async with (
+                self._command_slot(PRIORITY.WRITE),
+                self.session.get(
+                    url,
+                    auth=self._auth,
+                    timeout=self.request_timeout(CONST.WRITE_TIMEOUT),
+                ) as response,
+            ):
+                res = await response.json(content_type=None)
             return res["data"]
         except Exception:
             log.warning("Connection to Judo Zewa failed")
@@ -139,11 +491,22 @@ class RestAPI:
         log.warning("Unknown Device detected, ID=%s", res)
         return None
 
-    def close(self):
-        """Close REST connection."""
+    async def close(self):
+        """Close REST connection.
+
+        Pending writes are sent first. The connection pool belongs to the hub
+        and is closed with the last entry.
+        """
+        await self._flush_writes()
+        log.debug("Judo command queue stats: %s", self.queue_stats)
         log.info("Connection to Judo Zewa closed")
         return True
 
+    @property
+    def hub(self) -> JudoHub:
+        """Return the integration wide hub."""
+        return self._hub
+
     def get_devicetype(self):
         """Return device type."""
         return self._devicetype
@@ -188,68 +551,6 @@ class RestObject:
         """format str message as hex buffer to be sent to REST APPI"""
         return self.order_hex_buffer(text.encode("utf-8").hex(), flip)
 
-    @property
-    async def value(self):
-        """Returns the value from the REST API."""
-        if self._rest_api is None:
-            return None
-        if self._rest_item.format is FORMATS.BUTTON:
-            return None
-        if self._rest_item.format is FORMATS.NUMBER_WO:
-            return None
-        if self._rest_item.format is FORMATS.NUMBER_INTERNAL:
-            return None
-        if self._rest_item.format is FORMATS.SWITCH_INTERNAL:
-            return None
-        if self._rest_item.format is FORMATS.STATUS_WO:
-            return None
-
-        res = await self._rest_api.get_rest(self._rest_item.address_read)
-
-        if res is None:
-            return None
-
-        index = self._rest_item.read_index * 2
-        big_endian = res[index : index + self._rest_item.read_bytes * 2]
-        little_endian = bytes.fromhex(big_endian)[::-1].hex()
-        big_endian = bytes.fromhex(big_endian)[::1].hex()
-
-        if big_endian is None:
-            return None
-        if little_endian is None:
-            return None
-        if big_endian == "":
-            return None
-        if little_endian == "":
-            return None
-        match self._rest_item.format:
-            case FORMATS.SWITCH:
-                return None
-            case FORMATS.NUMBER:
-                return float(int(little_endian, 16) / self._divider)
-            case FORMATS.SW_VERSION:
-                major = str(int(little_endian[0:2], 16))
-                minor = str(int(little_endian[2:4], 16)).zfill(2)
-                letter = str(bytearray.fromhex(little_endian[4:6]).decode())
-                return str(major + "." + minor + letter)
-            case FORMATS.TIMESTAMP:
-                return str(datetime.fromtimestamp(int(big_endian, 16)))
-            case FORMATS.TEXT:
-                return bytearray.fromhex(big_endian).decode()
-            case FORMATS.STATUS:
-                return self._rest_item.get_translation_key_from_number(
-                    int(little_endian, 16)
-                )
-            case _:
-                log.warning(
-                    "Unknown format: %s in %s",
-                    str(self._rest_item.type),
-                    str(self._rest_item.translation_key),
-                )
-                return None
-        return None
-
-    # @value.setter
     async def setvalue(self, value=None) -> None:
         """Set the value of the rest register, does nothing when not R/W.
 
@@ -269,7 +570,6 @@ class RestObject:
             return
         if value is None:
             return
-        self._rest_item.state = value
         match self._rest_item.format:
             case FORMATS.SWITCH:
                 if value == 0:
@@ -1,39 +1,171 @@
-#INFO: After installation, these values must be selected once using SELECT-OTION and sent to judo so that the file can be created. 
-#The values are then saved in Homeassitan when the integration is restarted or updated 
+#INFO: After installation, these values must be selected once using SELECT-OTION and sent to judo so that the file can be created.
+#The values are then saved in Homeassitan when the integration is restarted or updated
 
+import asyncio
 import json
+import logging
 import os
+import time
+from collections.abc import Callable
+
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import CONST
 
+logging.basicConfig()
+log = logging.getLogger(__name__)
+
+# old file of all devices, imported by the first load
 STORAGE_PATH = "/config/judo_storage.json"
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # seconds, quick changes are written together
+SNAPSHOT_SAVE_DELAY = 300  # seconds between two saves of the values read
+SNAPSHOT_MAX_AGE = 7 * 24 * 3600  # seconds, older values are not shown
 
-# Liste der Entitäten, die gespeichert werden sollen (nur hier anpassen!)
+# entities whose last written value is kept (only change it here!)
 PERSISTENT_ENTITIES = ["sleep_mode_duration", "holiday_mode_write", "leakageprotection_max_waterflowrate", "leakageprotection_max_waterflow", "leakageprotection_max_waterflowtime"]
 
-async def save_last_written_value(hass: HomeAssistant, key: str, value: str) -> None:
-    """Speichert den letzten geschriebenen Wert in der JSON-Datei."""
-    if key not in PERSISTENT_ENTITIES:
-        return  # Nur speichern, wenn die Entität in der Liste ist
-
-    data = await load_last_written_values(hass)  # Vorhandene Werte laden
-    data[key] = value  # Neuen Wert speichern
-    
-    def _write_file():
-        with open(STORAGE_PATH, "w") as file:
-            json.dump(data, file)
-    
-    await hass.async_add_executor_job(_write_file)
-
-async def load_last_written_values(hass: HomeAssistant) -> dict:
-    """Lädt die gespeicherten Werte aus der JSON-Datei."""
+
+class LastWrittenValues:
+    """Last written values of a device.
+
+    The values are kept in memory. Home Assistant's Store writes them delayed
+    and atomically to .storage/judo_rest_api.<entry_id>, one file per device.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Construct LastWrittenValues.
+
+        :param hass: HomeAssistant instance
+        :type hass: HomeAssistant
+        :param entry_id: id of the config entry of the device
+        """
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, CONST.DOMAIN + "." + entry_id)
+        self._data: dict[str, str] | None = None
+        self._dirty = False
+        self._lock = asyncio.Lock()
+
+    async def async_load(self) -> dict:
+        """Load the stored values, only the first call reads them from disk."""
+        async with self._lock:
+            if self._data is None:
+                data = await self._store.async_load()
+                if data is None:
+                    data = await self._hass.async_add_executor_job(_read_legacy_file)
+                    if data:
+                        log.info("Imported values from %s", STORAGE_PATH)
+                        self._dirty = True
+                        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+                self._data = data
+        return self._data
+
+    @property
+    def values(self) -> dict:
+        """Return the values loaded by async_load, shared by all entities."""
+        if self._data is None:
+            return {}
+        return self._data
+
+    def set(self, key: str, value: str) -> None:
+        """Keep the last written value of an entity."""
+        if key not in PERSISTENT_ENTITIES:
+            return  # only entities of the list are kept
+        if self._data is None:
+            # not loaded yet, loading would overwrite the value
+            log.warning("Value of %s set before loading, ignored", key)
+            return
+        if self._data.get(key) == value:
+            return
+        self._data[key] = value
+        self._dirty = True
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Return the values to be written by the store."""
+        self._dirty = False
+        return dict(self._data)
+
+    async def async_flush(self) -> None:
+        """Write pending changes now, e.g. on unload."""
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the file of the device."""
+        await self._store.async_remove()
+
+
+class ValueSnapshot:
+    """Last known good values of the items of a device, with the time of their read.
+
+    On start the entities are filled with them at once, the first scan of the
+    device runs in the background.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Construct ValueSnapshot.
+
+        :param hass: HomeAssistant instance
+        :type hass: HomeAssistant
+        :param entry_id: id of the config entry of the device
+        """
+        self._store = Store(
+            hass, STORAGE_VERSION, CONST.DOMAIN + "." + entry_id + ".snapshot"
+        )
+        self._data_func: Callable[[], dict] | None = None
+
+    async def async_load(self) -> dict[str, tuple]:
+        """Load the values that are not older than SNAPSHOT_MAX_AGE.
+
+        :returns: dict of translation_key -> (value, unix timestamp of the read)
+        """
+        data = await self._store.async_load()
+        if not isinstance(data, dict):
+            return {}
+        oldest = time.time() - SNAPSHOT_MAX_AGE
+        values = {}
+        for key, entry in data.items():
+            if isinstance(entry, list) and len(entry) == 2 and entry[1] >= oldest:
+                values[key] = (entry[0], entry[1])
+        return values
+
+    def save(self, data_func: Callable[[], dict]) -> None:
+        """Schedule a save, at the latest after SNAPSHOT_SAVE_DELAY.
+
+        Further calls until then do not postpone the save.
+
+        :param data_func: returns translation_key -> [value, unix timestamp]
+        """
+        if self._data_func is None:
+            self._store.async_delay_save(self._collect, SNAPSHOT_SAVE_DELAY)
+        self._data_func = data_func
+
+    def _collect(self) -> dict:
+        """Return the values to be written by the store."""
+        data_func, self._data_func = self._data_func, None
+        return data_func()
+
+    async def async_flush(self) -> None:
+        """Write a scheduled save now, e.g. on unload."""
+        if self._data_func is not None:
+            await self._store.async_save(self._collect())
+
+    async def async_remove(self) -> None:
+        """Delete the file of the device."""
+        await self._store.async_remove()
+
+
+def _read_legacy_file() -> dict:
+    """Read the values of the old judo_storage.json, runs in the executor."""
     if not os.path.exists(STORAGE_PATH):
-        return {}  # Falls Datei nicht existiert, leeres Dict zurückgeben
-    
-    def _read_file():
-        try:
-            with open(STORAGE_PATH, "r") as file:
-                return json.load(file)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}  # Falls Datei beschädigt ist, leeres Dict zurückgeben
-    
-    return await hass.async_add_executor_job(_read_file)
+        return {}  # no old file
+    try:
+        with open(STORAGE_PATH, "r") as file:
+            data = json.load(file)
+    except (json.JSONDecodeError, OSError):
+        return {}  # damaged file
+    if not isinstance(data, dict):
+        return {}
+    return {key: value for key, value in data.items() if key in PERSISTENT_ENTITIES}
@@ -0,0 +1 @@
+"""Tests for the Judo REST API integration."""
@@ -0,0 +1,101 @@
+"""Fixtures for the tests of the Judo REST API integration.
+
+The device is replaced by a fake session of the hub, so the request logic of
+RestAPI runs unchanged without a network.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeHass:
+    """The part of HomeAssistant used by RestAPI."""
+
+    def async_create_background_task(self, target, name, eager_start=True):
+        """Run a task in the running loop of the test."""
+        return asyncio.get_running_loop().create_task(target, name=name)
+
+
+class FakeResponse:
+    """Response of the fake device."""
+
+    def __init__(self, data: str) -> None:
+        """Construct FakeResponse."""
+        self.status = 200
+        self._data = data
+
+    async def json(self, content_type=None) -> dict:
+        """Return the content like the REST API of the device."""
+        return {"data": self._data}
+
+
+class FakeSession:
+    """Keep-alive session answering like the device.
+
+    Every command sent is recorded in calls, the answer is looked up by the
+    register of the command in responses. Registers in failing do not answer.
+    """
+
+    closed = False
+
+    def __init__(self) -> None:
+        """Construct FakeSession."""
+        self.calls: list[str] = []
+        self.responses: dict[str, str] = {}
+        self.delay = 0.0
+        self.fail = False
+        self.failing: set[str] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @asynccontextmanager
+    async def get(self, url: str, auth=None, timeout=None):
+        """Send one command to the fake device."""
+        command = url.rsplit("/", 1)[-1]
+        self.calls.append(command)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.fail or command[:4] in self.failing:
+                raise ConnectionError(command)
+            yield FakeResponse(self.responses.get(command[:4], ""))
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def session() -> FakeSession:
+    """Return the fake session of the hub."""
+    return FakeSession()
+
+
+@pytest.fixture
+def make_api(session):
+    """Return a factory of RestAPI instances talking to the fake session."""
+
+    # imported here, the test modules are skipped without Home Assistant
+    from custom_components.judo_rest_api.const import CONF
+    from custom_components.judo_rest_api.hub import JudoHub
+    from custom_components.judo_rest_api.restobject import RestAPI
+
+    def _make_api(max_concurrent_requests: int = 1) -> RestAPI:
+        hub = JudoHub(None)
+        hub._session = session
+        config_entry = SimpleNamespace(
+            entry_id="test",
+            data={
+                CONF.HOST: "judo.local",
+                CONF.PORT: 80,
+                CONF.USERNAME: "admin",
+                CONF.PASSWORD: "secret",
+                CONF.MAX_CONCURRENT_REQUESTS: max_concurrent_requests,
+            },
+        )
+        return RestAPI(config_entry, FakeHass(), hub)
+
+    return _make_api
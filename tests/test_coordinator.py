@@ -0,0 +1,146 @@
+"""Tests of the scans of MyCoordinator against a fake REST API."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.judo_rest_api.const import (  # noqa: E402
+    CONF,
+    DEVICES,
+    FORMATS,
+    TYPES,
+)
+from custom_components.judo_rest_api.coordinator import MyCoordinator  # noqa: E402
+from custom_components.judo_rest_api.items import RestItem  # noqa: E402
+
+
+class FakeRestAPI:
+    """REST API that answers the registers in responses, the others fail."""
+
+    available = True
+    queue_stats: dict = {}
+
+    def __init__(self, responses: dict[str, str], hang: bool = False) -> None:
+        """Construct FakeRestAPI.
+
+        :param responses: raw response by register
+        :param hang: do not return after the responses, like a device that
+            stops answering in the middle of a scan
+        """
+        self.responses = responses
+        self.hang = hang
+        self.batches: list[list[str]] = []
+
+    async def get_rest_batch(self, commands, timeout=60, on_result=None):
+        """Read the registers like RestAPI.get_rest_batch."""
+        self.batches.append(list(commands))
+        results = dict.fromkeys(commands)
+        for command in commands:
+            if command in self.responses:
+                results[command] = self.responses[command]
+                on_result(command, self.responses[command])
+        if self.hang:
+            await asyncio.Event().wait()
+        return results
+
+
+def number_item(translation_key: str, address_read: str) -> RestItem:
+    """Return a 2 byte number item of a register."""
+    return RestItem(
+        translation_key=translation_key,
+        mformat=FORMATS.NUMBER,
+        mtype=TYPES.SENSOR,
+        device=DEVICES.SYS,
+        address_read=address_read,
+        read_bytes=2,
+    )
+
+
+ITEMS = [
+    number_item("operating_days", "2500"),
+    number_item("learning_water_quantity", "6400"),
+    number_item("water_hardness", "5100"),
+]
+
+
+def make_coordinator(rest_api: FakeRestAPI) -> MyCoordinator:
+    """Return a coordinator of the test items."""
+    config_entry = SimpleNamespace(entry_id="test", data={CONF.SCAN_INTERVAL: 60})
+    return MyCoordinator(MagicMock(), rest_api, ITEMS, config_entry)
+
+
+def test_partial_scan_keeps_the_registers_read():
+    rest_api = FakeRestAPI({"2500": "0A00"})
+    coordinator = make_coordinator(rest_api)
+
+    data = asyncio.run(coordinator.fetch_data())
+
+    assert data.values["operating_days"] == 10
+    assert data.values["learning_water_quantity"] is None
+    assert data.changed == {"operating_days"}
+    assert coordinator.failed_items == {"learning_water_quantity", "water_hardness"}
+
+
+def test_next_scan_resumes_with_the_registers_not_read():
+    rest_api = FakeRestAPI({"2500": "0A00"})
+    coordinator = make_coordinator(rest_api)
+
+    async def run():
+        await coordinator.fetch_data()
+        # all registers are due again, the deferred ones have waited longest
+        coordinator._next_poll[0] = 1.0
+        rest_api.responses.update({"6400": "0100", "5100": "0200"})
+        return await coordinator.fetch_data()
+
+    data = asyncio.run(run())
+
+    assert rest_api.batches == [["2500", "6400", "5100"], ["6400", "5100", "2500"]]
+    assert data.values == {
+        "operating_days": 10,
+        "learning_water_quantity": 1,
+        "water_hardness": 2,
+    }
+    assert coordinator.failed_items == set()
+
+
+def test_interrupted_scan_returns_what_was_read():
+    rest_api = FakeRestAPI({"6400": "0500"}, hang=True)
+    coordinator = make_coordinator(rest_api)
+
+    async def run():
+        scan = asyncio.create_task(coordinator.fetch_data())
+        await asyncio.sleep(0.01)
+        scan.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await scan
+        # what _async_update_data does when the scan timed out
+        return coordinator._finish_scan()
+
+    data = asyncio.run(run())
+
+    assert data.values["learning_water_quantity"] == 5
+    assert data.changed == {"learning_water_quantity"}
+    assert coordinator.failed_items == {"operating_days", "water_hardness"}
+    # registers that were read are not due before their interval
+    assert coordinator.due_items(range(len(ITEMS))) == [0, 2]
+
+
+def test_scan_does_not_overwrite_an_item_being_written():
+    rest_api = FakeRestAPI({"2500": "0A00"})
+    coordinator = make_coordinator(rest_api)
+    coordinator.set_state(0, 20)
+
+    async def run():
+        with coordinator.pending_write(0):
+            # the device still answers with the value before the write
+            return await coordinator.fetch_data()
+
+    data = asyncio.run(run())
+
+    assert data.values["operating_days"] == 20
+    assert coordinator.get_state(0) == 20
+    assert coordinator._writing == {}
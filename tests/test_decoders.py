@@ -0,0 +1,61 @@
+"""Tests of the decoders of register payloads."""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.judo_rest_api.const import FORMATS  # noqa: E402
+from custom_components.judo_rest_api.decoders import build_decoder  # noqa: E402
+
+
+def test_number_is_little_endian_at_its_offset():
+    decode = build_decoder(FORMATS.NUMBER, read_index=2, read_bytes=2)
+    assert decode(bytes.fromhex("FFFF3412FFFF")) == 0x1234
+
+
+def test_number_is_divided():
+    decode = build_decoder(FORMATS.NUMBER, read_index=0, read_bytes=4, divider=1000)
+    assert decode((12345).to_bytes(4, "little")) == pytest.approx(12.345)
+
+
+def test_sw_version():
+    decode = build_decoder(FORMATS.SW_VERSION, read_index=0, read_bytes=3)
+    assert decode(bytes.fromhex("410502")) == "2.05A"
+
+
+def test_timestamp_is_big_endian():
+    decode = build_decoder(FORMATS.TIMESTAMP, read_index=0, read_bytes=4)
+    assert decode((1700000000).to_bytes(4, "big")) == str(
+        datetime.fromtimestamp(1700000000)
+    )
+
+
+def test_text():
+    decode = build_decoder(FORMATS.TEXT, read_index=1, read_bytes=4)
+    assert decode(b"xJudo") == "Judo"
+
+
+def test_status_is_translated():
+    decode = build_decoder(
+        FORMATS.STATUS,
+        read_index=1,
+        read_bytes=1,
+        number_to_key={1: "on", 2: "off"}.get,
+    )
+    assert decode(bytes.fromhex("0002")) == "off"
+    assert decode(bytes.fromhex("0005")) is None
+
+
+@pytest.mark.parametrize(
+    "mformat", [FORMATS.NUMBER, FORMATS.SW_VERSION, FORMATS.TIMESTAMP, FORMATS.TEXT]
+)
+def test_payload_too_short_is_none(mformat):
+    decode = build_decoder(mformat, read_index=4, read_bytes=2)
+    assert decode(bytes.fromhex("01020304")) is None
+
+
+def test_unknown_format_is_none():
+    decode = build_decoder("no format", read_index=0, read_bytes=1)
+    assert decode(b"\x01") is None
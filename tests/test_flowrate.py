@@ -0,0 +1,67 @@
+"""Tests of the rate estimation of water_flow."""
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.judo_rest_api.const import SMOOTHING  # noqa: E402
+from custom_components.judo_rest_api.flowrate import RateEstimator  # noqa: E402
+
+
+def feed(estimator: RateEstimator, samples: list[tuple[float, float]]) -> float:
+    """Add all samples and return the last rate."""
+    rate = 0.0
+    for timestamp, value in samples:
+        rate = estimator.add_sample(timestamp, value)
+    return rate
+
+
+def test_first_sample_has_no_rate():
+    estimator = RateEstimator()
+    assert estimator.add_sample(0, 100) == 0.0
+
+
+def test_window_averages_over_the_window():
+    estimator = RateEstimator(window=3)
+    assert feed(estimator, [(0, 0), (10, 10), (20, 20), (30, 30)]) == 1.0
+
+
+def test_window_drops_old_samples():
+    estimator = RateEstimator(window=1)
+    assert feed(estimator, [(0, 0), (10, 10), (20, 30)]) == 2.0
+
+
+def test_no_step_within_the_window_is_no_flow():
+    estimator = RateEstimator(window=3)
+    assert feed(estimator, [(0, 0), (10, 10), (20, 10), (30, 10), (40, 10)]) == 0.0
+
+
+def test_standing_still_limits_the_rate_to_one_step():
+    estimator = RateEstimator(window=3, resolution=1)
+    # 10 units in 20 s, but no step for 10 s: at most 1 unit in 10 s
+    assert feed(estimator, [(0, 0), (10, 10), (20, 10)]) == pytest.approx(0.1)
+
+
+def test_ewma_weights_the_newest_interval():
+    estimator = RateEstimator(method=SMOOTHING.EWMA, alpha=0.5)
+    assert feed(estimator, [(0, 0), (10, 10)]) == pytest.approx(0.5)
+    assert estimator.add_sample(20, 30) == pytest.approx(1.25)
+
+
+def test_regression_returns_the_slope():
+    estimator = RateEstimator(method=SMOOTHING.REGRESSION, window=3)
+    assert feed(estimator, [(0, 0), (1, 2), (2, 4), (3, 6)]) == pytest.approx(2.0)
+
+
+def test_samples_out_of_order_are_ignored():
+    estimator = RateEstimator(window=3)
+    rate = feed(estimator, [(0, 0), (10, 10)])
+    assert estimator.add_sample(5, 100) == rate
+    assert estimator.add_sample(10, 100) == rate
+
+
+def test_counter_reset_starts_over():
+    estimator = RateEstimator(window=3)
+    feed(estimator, [(0, 100), (10, 110)])
+    assert estimator.add_sample(20, 3) == 0.0
+    assert estimator.add_sample(30, 13) == 1.0
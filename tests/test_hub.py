@@ -0,0 +1,73 @@
+"""Tests of the hub shared by all Judo config entries."""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.judo_rest_api.hub import (  # noqa: E402
+    GOLDEN_RATIO_FRACTION,
+    JudoHub,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Return a list whose first element is the monotonic time."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_register_reuses_free_slots():
+    hub = JudoHub(None)
+    for entry_id in ("a", "b", "c"):
+        hub.register(entry_id)
+    hub.unregister("b")
+    hub.register("d")
+    assert hub._slots == {"a": 0, "c": 2, "d": 1}
+    for entry_id in ("a", "c", "d"):
+        hub.unregister(entry_id)
+    assert hub.empty
+
+
+def test_poll_phases_of_the_entries_are_spread(clock):
+    hub = JudoHub(None)
+    hub.register("a")
+    hub.register("b")
+    clock[0] += 7
+    spread = (hub.poll_phase("b", 60) - hub.poll_phase("a", 60)) % 60
+    assert spread == pytest.approx(GOLDEN_RATIO_FRACTION * 60)
+
+
+def test_poll_phase_does_not_depend_on_the_setup_time(clock):
+    hub = JudoHub(None)
+    hub.register("a")
+    hub.register("b")
+    first_poll = clock[0] + hub.poll_phase("b", 60)
+    # the entry is set up again much later
+    clock[0] += 130.5
+    next_poll = clock[0] + hub.poll_phase("b", 60)
+    assert 0 <= next_poll - clock[0] < 60
+    assert (next_poll - first_poll) % 60 == pytest.approx(0)
+
+
+def test_stats_count_requests_and_errors():
+    hub = JudoHub(None)
+    hub.register("a")
+
+    async def run():
+        async with hub.request_slot():
+            pass
+        with pytest.raises(ConnectionError):
+            async with hub.request_slot():
+                raise ConnectionError
+
+    asyncio.run(run())
+    stats = hub.stats
+    assert stats["entries"] == 1
+    assert stats["requests"] == 2
+    assert stats["errors"] == 1
+    assert stats["latency_max"] >= stats["latency_avg"] >= 0
@@ -0,0 +1,354 @@
+"""Tests of the requests of RestAPI against a fake device."""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.judo_rest_api.const import CONST, PRIORITY  # noqa: E402
+
+
+def expire_breaker(api) -> None:
+    """Let the backoff of an open circuit breaker run out."""
+    api._open_until = time.monotonic() - 1
+
+
+def test_breaker_opens_after_threshold(make_api, session):
+    api = make_api()
+    session.fail = True
+
+    async def run():
+        for _ in range(CONST.BREAKER_THRESHOLD - 1):
+            assert await api.get_rest("2800") is None
+        assert api.available
+        assert await api.get_rest("2800") is None
+
+    asyncio.run(run())
+    assert not api.available
+
+
+def test_success_resets_the_failure_count(make_api, session):
+    api = make_api()
+    session.responses["2800"] = "01000000"
+
+    async def run():
+        for fail in [True] * (CONST.BREAKER_THRESHOLD - 1) + [False] + [True]:
+            session.fail = fail
+            await api.get_rest("2800")
+
+    asyncio.run(run())
+    assert api.available
+
+
+def test_open_breaker_sends_no_requests(make_api, session):
+    api = make_api()
+    session.fail = True
+
+    async def run():
+        for _ in range(CONST.BREAKER_THRESHOLD):
+            await api.get_rest("2800")
+        sent = len(session.calls)
+        session.fail = False
+        assert await api.get_rest("2800") is None
+        assert len(session.calls) == sent
+
+    asyncio.run(run())
+
+
+def test_failed_probe_doubles_the_backoff(make_api, session):
+    api = make_api()
+    session.fail = True
+
+    async def run():
+        for _ in range(CONST.BREAKER_THRESHOLD):
+            await api.get_rest("2800")
+        backoffs = []
+        while api._backoff < CONST.BREAKER_BACKOFF_MAX:
+            expire_breaker(api)
+            assert await api.get_rest("2800") is None
+            assert session.calls[-1] == "FF00"
+            backoffs.append(api._backoff)
+        expire_breaker(api)
+        await api.get_rest("2800")
+        backoffs.append(api._backoff)
+        return backoffs
+
+    backoffs = asyncio.run(run())
+    assert backoffs[0] == 2 * CONST.BREAKER_BACKOFF_MIN
+    assert backoffs[-2:] == [CONST.BREAKER_BACKOFF_MAX, CONST.BREAKER_BACKOFF_MAX]
+    assert not api.available
+
+
+def test_successful_probe_closes_the_breaker(make_api, session):
+    api = make_api()
+    session.fail = True
+    session.responses["2800"] = "01000000"
+
+    async def run():
+        for _ in range(CONST.BREAKER_THRESHOLD):
+            await api.get_rest("2800")
+        expire_breaker(api)
+        session.fail = False
+        return await api.get_rest("2800")
+
+    assert asyncio.run(run()) == "01000000"
+    assert session.calls[-2:] == ["FF00", "2800"]
+    assert api.available
+    assert api._backoff == CONST.BREAKER_BACKOFF_MIN
+
+
+def test_batch_reads_one_register_at_a_time_by_default(make_api, session):
+    api = make_api()
+    session.delay = 0.01
+    session.responses.update({"2500": "0A00", "6400": "0100", "5100": "0200"})
+    received = {}
+
+    results = asyncio.run(
+        api.get_rest_batch(["2500", "6400", "5100"], on_result=received.__setitem__)
+    )
+
+    assert results == {"2500": "0A00", "6400": "0100", "5100": "0200"}
+    assert received == results
+    assert session.max_in_flight == 1
+
+
+def test_batch_reads_in_parallel_when_configured(make_api, session):
+    api = make_api(max_concurrent_requests=2)
+    session.delay = 0.01
+
+    asyncio.run(api.get_rest_batch(["2500", "6400", "5100"]))
+
+    assert session.max_in_flight == 2
+
+
+def test_batch_retries_failed_registers_once(make_api, session):
+    api = make_api()
+    session.responses.update({"2500": "0A00"})
+    session.failing.add("6400")
+    received = {}
+
+    results = asyncio.run(
+        api.get_rest_batch(["2500", "6400"], on_result=received.__setitem__)
+    )
+
+    assert results == {"2500": "0A00", "6400": None}
+    assert received == {"2500": "0A00"}
+    assert session.calls == ["2500", "6400", "6400"]
+
+
+def test_batch_defers_registers_over_the_budget(make_api, session):
+    api = make_api()
+    session.delay = 0.1
+
+    results = asyncio.run(
+        api.get_rest_batch(["2500", "6400", "5100", "0E00"], timeout=0.15)
+    )
+
+    # the second register started within the budget, the others did not fit
+    assert session.calls == ["2500", "6400"]
+    assert results["5100"] is None
+    assert results["0E00"] is None
+
+
+async def run_commands(api, commands, hold=0.01):
+    """Run (name, priority) commands through the queue, started in this order.
+
+    :returns: "+name" when a command was sent, "-name" when it was done
+    """
+    events = []
+
+    async def command(name, priority):
+        async with api._command_slot(priority):
+            events.append("+" + name)
+            await asyncio.sleep(hold)
+            events.append("-" + name)
+
+    tasks = []
+    for name, priority in commands:
+        tasks.append(asyncio.create_task(command(name, priority)))
+        # let the command enter the queue before the next one
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return events
+
+
+def sent_order(events):
+    """Return the names of the commands in the order they were sent."""
+    return [event[1:] for event in events if event[0] == "+"]
+
+
+def max_in_flight(events):
+    """Return the largest number of commands in flight at the same time."""
+    in_flight = largest = 0
+    for event in events:
+        in_flight += 1 if event[0] == "+" else -1
+        largest = max(largest, in_flight)
+    return largest
+
+
+def test_queue_sends_by_priority_then_in_order(make_api):
+    api = make_api()
+    commands = [
+        ("scan0", PRIORITY.SCAN),
+        ("scan1", PRIORITY.SCAN),
+        ("read", PRIORITY.READ),
+        ("scan2", PRIORITY.SCAN),
+        ("write", PRIORITY.WRITE),
+    ]
+    events = asyncio.run(run_commands(api, commands))
+    assert sent_order(events) == ["scan0", "write", "read", "scan1", "scan2"]
+    assert max_in_flight(events) == 1
+    assert api.queue_stats["commands"] == 5
+    assert api.queue_stats["depth"] == 0
+    assert api.queue_stats["in_flight"] == 0
+
+
+def test_queue_sends_parallel_reads_up_to_the_width(make_api):
+    api = make_api(max_concurrent_requests=2)
+    commands = [(f"scan{i}", PRIORITY.SCAN) for i in range(4)]
+    events = asyncio.run(run_commands(api, commands))
+    assert max_in_flight(events) == 2
+
+
+def test_write_is_sent_alone(make_api):
+    api = make_api(max_concurrent_requests=2)
+    commands = [
+        ("scan0", PRIORITY.SCAN),
+        ("scan1", PRIORITY.SCAN),
+        ("write", PRIORITY.WRITE),
+        ("scan2", PRIORITY.SCAN),
+        ("scan3", PRIORITY.SCAN),
+    ]
+    events = asyncio.run(run_commands(api, commands))
+    assert sent_order(events) == ["scan0", "scan1", "write", "scan2", "scan3"]
+    # the write waited for both reads, the next reads waited for the write
+    start = events.index("+write")
+    assert events[start - 2 : start + 2] == ["-scan0", "-scan1", "+write", "-write"]
+
+
+def test_cancelled_command_leaves_the_queue(make_api):
+    api = make_api()
+
+    async def run():
+        sent = []
+
+        async def command(name):
+            async with api._command_slot(PRIORITY.SCAN):
+                sent.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(command("first"))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(command("cancelled"))
+        last = asyncio.create_task(command("last"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(first, last)
+        return sent
+
+    assert asyncio.run(run()) == ["first", "last"]
+    assert api.queue_stats["in_flight"] == 0
+    assert api.queue_stats["depth"] == 0
+
+
+def test_cancel_after_handover_frees_the_slot(make_api):
+    api = make_api()
+
+    async def run():
+        async def waiting():
+            async with api._command_slot(PRIORITY.SCAN):
+                pytest.fail("cancelled command was sent")
+
+        async with api._command_slot(PRIORITY.SCAN):
+            task = asyncio.create_task(waiting())
+            await asyncio.sleep(0)
+        # the slot was handed over, but the command did not run yet
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert api._in_flight == 0
+        async with asyncio.timeout(1), api._command_slot(PRIORITY.READ):
+            pass
+
+    asyncio.run(run())
+
+
+def test_writes_within_the_debounce_are_coalesced(make_api, session):
+    api = make_api()
+    session.responses["5600"] = "ok"
+
+    async def run():
+        return await asyncio.gather(
+            *(api.set_rest("5600", value) for value in ("01", "02", "03"))
+        )
+
+    assert asyncio.run(run()) == ["ok", "ok", "ok"]
+    assert session.calls == ["560003"]
+
+
+def test_writes_of_different_commands_are_not_coalesced(make_api, session):
+    api = make_api()
+
+    async def run():
+        writes = asyncio.gather(api.set_rest("5600", "01"), api.set_rest("5300", "02"))
+        await asyncio.sleep(0)
+        await api._flush_writes()
+        await writes
+
+    asyncio.run(run())
+    assert sorted(session.calls) == ["530002", "560001"]
+
+
+def test_fields_of_a_composite_write_are_merged(make_api, session):
+    api = make_api()
+
+    async def run():
+        writes = asyncio.gather(
+            api.write_value("5F00", bytes.fromhex("0A000000"), (slice(0, 2),)),
+            api.write_value("5F00", bytes.fromhex("00001400"), (slice(2, 4),)),
+        )
+        await asyncio.sleep(0)
+        await api._flush_writes()
+        await writes
+
+    asyncio.run(run())
+    assert session.calls == ["5F000A001400"]
+
+
+def test_fields_are_merged_onto_the_write_in_flight(make_api, session):
+    api = make_api()
+    session.delay = 0.05
+
+    async def run():
+        first = asyncio.create_task(
+            api.write_value("5F00", bytes.fromhex("0A000000"), (slice(0, 2),))
+        )
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        api._writes["5F00"].flush.set()
+        await asyncio.sleep(0.01)
+        # the first write is on its way, the second one keeps its field
+        second = asyncio.create_task(
+            api.write_value("5F00", bytes.fromhex("00001400"), (slice(2, 4),))
+        )
+        await asyncio.sleep(0)
+        await api._flush_writes()
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+    assert session.calls == ["5F000A000000", "5F000A001400"]
+
+
+def test_command_without_payload_follows_the_pending_writes(make_api, session):
+    api = make_api()
+
+    async def run():
+        value = asyncio.create_task(api.set_rest("5600", "02"))
+        await asyncio.sleep(0)
+        await api.set_rest("5700", "")
+        await value
+
+    asyncio.run(run())
+    assert session.calls == ["560002", "5700"]